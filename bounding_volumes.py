@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Volumes envolventes pré-calculados para Cosmic Scales
+
+ScaleObject.calculateBoundingBox percorre todos os vértices no carregamento
+só para obter modelBoundingSize, e nada fornece uma esfera envolvente para
+descartar escalas fora do ecrã ou já invisíveis. Este utilitário calcula, por
+modelo e por primitiva (grupo 'o'/'g' nos OBJ), o AABB, uma esfera envolvente
+justa (método de Ritter, comparado com a esfera centrada no AABB), o centróide
+e o modelBoundingSize, nas mesmas coordenadas que os carregadores do navegador
+entregam. O resultado vai para <modelo>_bounds.json ou, com --embed, para o
+'extras' do GLB/GLTF (lido pelo GLTFLoader). --validate confirma que os
+valores guardados correspondem à geometria.
+"""
+
+import json
+import math
+import os
+import sys
+
+from model_io import (
+    find_model_files, load_geometry, load_gltf, option, parse_gltf_geometry, read_glb, write_glb,
+)
+
+# Tolerância relativa à dimensão do modelo (vértices em float32)
+TOLERANCE = 1e-5
+
+
+def compute_bounds(points):
+    """AABB, centróide, modelBoundingSize e esfera envolvente de uma lista de pontos"""
+    if not points:
+        return None
+
+    bmin = [min(p[k] for p in points) for k in range(3)]
+    bmax = [max(p[k] for p in points) for k in range(3)]
+    centroid = [sum(p[k] for p in points) / len(points) for k in range(3)]
+    center, radius = bounding_sphere(points, bmin, bmax)
+
+    return {
+        'min': bmin,
+        'max': bmax,
+        'centroid': centroid,
+        'modelBoundingSize': max(bmax[k] - bmin[k] for k in range(3)),
+        'sphere': {'center': center, 'radius': radius},
+        'vertexCount': len(points),
+    }
+
+
+def bounding_sphere(points, bmin, bmax):
+    """Esfera de Ritter; devolve a esfera centrada no AABB se esta for menor"""
+    def dist2(a, b):
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+    # Par de pontos afastados: o mais distante de um ponto qualquer e o mais distante desse
+    y = max(points, key=lambda p: dist2(p, points[0]))
+    z = max(points, key=lambda p: dist2(p, y))
+    center = [(y[k] + z[k]) / 2 for k in range(3)]
+    radius = math.sqrt(dist2(y, z)) / 2
+
+    for p in points:
+        d = math.sqrt(dist2(p, center))
+        if d > radius:
+            # Aumenta a esfera o mínimo necessário para incluir p
+            new_radius = (radius + d) / 2
+            shift = (new_radius - radius) / d
+            center = [center[k] + (p[k] - center[k]) * shift for k in range(3)]
+            radius = new_radius
+
+    box_center = [(bmin[k] + bmax[k]) / 2 for k in range(3)]
+    box_radius = math.sqrt(max(dist2(p, box_center) for p in points))
+    if box_radius < radius:
+        return box_center, box_radius
+    return center, radius
+
+
+def obj_groups(filename, vertices):
+    """Vértices referenciados por cada grupo 'o'/'g' de um OBJ"""
+    groups = {}
+    name = None
+    with open(filename, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            if parts[0] in ('o', 'g'):
+                name = ' '.join(parts[1:]) or parts[0]
+            elif parts[0] in ('f', 'l'):
+                members = groups.setdefault(name or 'default', set())
+                for p in parts[1:]:
+                    members.add(int(p.split('/')[0]) - 1)
+    return [(group, [vertices[i] for i in sorted(members) if 0 <= i < len(vertices)])
+            for group, members in groups.items()]
+
+
+def gltf_primitives(filename):
+    """Vértices (já transformados como no GLTFLoader) de cada primitiva de um GLTF/GLB"""
+    gltf, _ = load_gltf(filename)
+    geometry = parse_gltf_geometry(filename)
+    vertices = geometry['vertices']
+
+    # parse_gltf_geometry concatena as primitivas pela ordem; reconstrói os intervalos
+    primitives = []
+    offset = 0
+    for mesh_index, mesh in enumerate(gltf.get('meshes', [])):
+        seen = {}
+        for prim_index, prim in enumerate(mesh.get('primitives', [])):
+            attributes = prim.get('attributes', {})
+            if 'POSITION' not in attributes:
+                continue
+            count = gltf['accessors'][attributes['POSITION']]['count']
+            key = (attributes.get('POSITION'), attributes.get('COLOR_0'), prim.get('material'))
+            start = seen.setdefault(key, offset)
+            if start == offset:
+                offset += count
+            primitives.append(((mesh_index, prim_index), vertices[start:start + count]))
+    return primitives
+
+
+def model_bounds(filename):
+    """Volumes do modelo inteiro e de cada primitiva"""
+    ext = os.path.splitext(filename)[1].lower()
+    geometry = load_geometry(filename)
+    result = compute_bounds(geometry['vertices'])
+    if result is None:
+        raise ValueError("Modelo sem vértices")
+
+    if ext == '.obj':
+        result['primitives'] = [dict(compute_bounds(points), group=group)
+                                for group, points in obj_groups(filename, geometry['vertices']) if points]
+    else:
+        result['primitives'] = [dict(compute_bounds(points), mesh=mesh, primitive=prim)
+                                for (mesh, prim), points in gltf_primitives(filename) if points]
+    return result
+
+
+def bounds_path(filename):
+    """Ficheiro lateral com os volumes (ex.: sun.obj → sun_bounds.json)"""
+    return os.path.splitext(filename)[0] + '_bounds.json'
+
+
+def embed_bounds(filename, bounds, output_file):
+    """Grava os volumes no extras da raiz (modelo) e de cada primitiva"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.glb':
+        gltf, bin_data = read_glb(filename)
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            gltf = json.load(f)
+        bin_data = None
+
+    model = {k: v for k, v in bounds.items() if k != 'primitives'}
+    gltf.setdefault('extras', {})['bounds'] = model
+    for entry in bounds['primitives']:
+        prim = gltf['meshes'][entry['mesh']]['primitives'][entry['primitive']]
+        prim.setdefault('extras', {})['bounds'] = {k: v for k, v in entry.items() if k not in ('mesh', 'primitive')}
+
+    if ext == '.glb':
+        write_glb(output_file, gltf, bin_data)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(gltf, f, indent=2)
+
+
+def read_stored_bounds(filename):
+    """Lê os volumes guardados (ficheiro lateral ou extras)"""
+    if os.path.exists(bounds_path(filename)):
+        with open(bounds_path(filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    if os.path.splitext(filename)[1].lower() in ('.glb', '.gltf'):
+        gltf, _ = load_gltf(filename)
+        if 'bounds' in gltf.get('extras', {}):
+            stored = dict(gltf['extras']['bounds'])
+            stored['primitives'] = []
+            for mesh_index, mesh in enumerate(gltf.get('meshes', [])):
+                for prim_index, prim in enumerate(mesh.get('primitives', [])):
+                    if 'bounds' in prim.get('extras', {}):
+                        stored['primitives'].append(dict(prim['extras']['bounds'], mesh=mesh_index, primitive=prim_index))
+            return stored
+
+    return None
+
+
+def compare_bounds(label, stored, actual, points):
+    """Compara um conjunto de volumes guardados com os recalculados"""
+    tol = TOLERANCE * max(actual['modelBoundingSize'], 1e-12)
+    problems = []
+
+    for key in ('min', 'max', 'centroid'):
+        if any(abs(stored[key][k] - actual[key][k]) > tol for k in range(3)):
+            problems.append(f"{key} {stored[key]} != {actual[key]}")
+    if abs(stored['modelBoundingSize'] - actual['modelBoundingSize']) > tol:
+        problems.append(f"modelBoundingSize {stored['modelBoundingSize']} != {actual['modelBoundingSize']}")
+    if stored.get('vertexCount') != actual['vertexCount']:
+        problems.append(f"vertexCount {stored.get('vertexCount')} != {actual['vertexCount']}")
+
+    # A esfera guardada tem de conter todos os vértices e não ser maior que a do AABB
+    center, radius = stored['sphere']['center'], stored['sphere']['radius']
+    outside = sum(1 for p in points
+                  if math.sqrt(sum((p[k] - center[k]) ** 2 for k in range(3))) > radius + tol)
+    if outside:
+        problems.append(f"{outside} vértices fora da esfera")
+    half_diagonal = math.sqrt(sum((actual['max'][k] - actual['min'][k]) ** 2 for k in range(3))) / 2
+    if radius > half_diagonal + tol:
+        problems.append(f"raio {radius:.6f} maior que a meia diagonal do AABB {half_diagonal:.6f}")
+
+    for problem in problems:
+        print(f"  ❌ {label}: {problem}")
+    return not problems
+
+
+def validate_bounds(filename):
+    """Verifica que os volumes guardados correspondem à geometria"""
+    print(f"\n🔍 Validando volumes: {filename}")
+    stored = read_stored_bounds(filename)
+    if stored is None:
+        print("  ❌ ERRO: Nenhum volume guardado (ficheiro _bounds.json ou extras)")
+        return False
+
+    geometry = load_geometry(filename)
+    actual = model_bounds(filename)
+    ok = compare_bounds('modelo', stored, actual, geometry['vertices'])
+
+    if os.path.splitext(filename)[1].lower() == '.obj':
+        groups = dict(obj_groups(filename, geometry['vertices']))
+        actual_prims = {p['group']: p for p in actual['primitives']}
+        key_of = lambda p: p['group']
+        points_of = lambda key: groups[key]
+    else:
+        prim_points = dict(gltf_primitives(filename))
+        actual_prims = {(p['mesh'], p['primitive']): p for p in actual['primitives']}
+        key_of = lambda p: (p['mesh'], p['primitive'])
+        points_of = lambda key: prim_points[key]
+
+    stored_keys = {key_of(p) for p in stored.get('primitives', [])}
+    if stored_keys != set(actual_prims):
+        print(f"  ❌ Primitivas guardadas ({len(stored_keys)}) != primitivas do modelo ({len(actual_prims)})")
+        ok = False
+    for entry in stored.get('primitives', []):
+        key = key_of(entry)
+        if key in actual_prims:
+            ok = compare_bounds(f"primitiva {key}", entry, actual_prims[key], points_of(key)) and ok
+
+    if ok:
+        print(f"  ✓ Volumes válidos ({len(actual_prims)} primitivas)")
+    return ok
+
+
+def process_model(filename, embed=False, output_file=None):
+    """Calcula e grava os volumes de um modelo"""
+    bounds = model_bounds(filename)
+    sphere = bounds['sphere']
+    print(f"\n📐 {filename}")
+    print(f"  AABB: {[round(c, 4) for c in bounds['min']]} → {[round(c, 4) for c in bounds['max']]}")
+    print(f"  modelBoundingSize: {bounds['modelBoundingSize']:.4f}")
+    print(f"  Esfera: centro {[round(c, 4) for c in sphere['center']]}, raio {sphere['radius']:.4f}")
+    print(f"  Primitivas: {len(bounds['primitives'])}")
+
+    if embed and os.path.splitext(filename)[1].lower() in ('.glb', '.gltf'):
+        target = output_file or filename
+        embed_bounds(filename, bounds, target)
+        print(f"✓ Volumes embutidos em: {target}")
+    else:
+        target = output_file or bounds_path(filename)
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump(bounds, f, indent=2)
+        print(f"✓ Volumes salvos em: {target}")
+    return bounds
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Volumes Envolventes Pré-calculados           ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python bounding_volumes.py <modelo> [opções]
+  python bounding_volumes.py --all
+  python bounding_volumes.py --validate <modelo> [...]
+
+Opções:
+  --embed              Guarda no 'extras' do GLB/GLTF em vez de <modelo>_bounds.json
+  --output <arquivo>   Ficheiro de saída (padrão: no lugar / ficheiro lateral)
+  --all                Calcula para todos os modelos em models/
+
+Exemplos:
+  python bounding_volumes.py models/sun.obj
+  python bounding_volumes.py models/hydrogen_no_bg.glb --embed
+  python bounding_volumes.py --validate models/sun.obj
+        """)
+        return 0
+
+    if sys.argv[1] == '--validate':
+        files = sys.argv[2:]
+        results = []
+        for filename in files:
+            try:
+                results.append(validate_bounds(filename))
+            except Exception as e:
+                print(f"❌ Erro ao validar {filename}: {e}")
+                results.append(False)
+        return 0 if files and all(results) else 1
+
+    if sys.argv[1] == '--all':
+        # Como em validate_models.py: models/ é relativo à pasta do script
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        files = find_model_files('models')
+    else:
+        files = [sys.argv[1]]
+
+    output_file = option('--output') if len(files) == 1 else None
+
+    failed = 0
+    for filename in files:
+        if not os.path.exists(filename):
+            print(f"❌ Arquivo não encontrado: {filename}")
+            failed += 1
+            continue
+        try:
+            process_model(filename, '--embed' in sys.argv, output_file)
+        except Exception as e:
+            print(f"❌ Erro ao processar {filename}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
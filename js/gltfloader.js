@@ -118,11 +118,28 @@ class GLTFLoader {
                 translation[2] - avgTranslation[2]
             ];
             
+            // Primitivas da mesma malha que partilham vértices (ex.: várias LINE_STRIP)
+            const sharedOffsets = new Map();
+            
             for (const prim of mesh.primitives) {
                 const vertices = prim.attributes && prim.attributes.POSITION !== undefined
                     ? this._getAccessor(gltf, prim.attributes.POSITION)
                     : [];
                 
+                const sharedKey = prim.attributes && prim.attributes.POSITION !== undefined
+                    ? `${prim.attributes.POSITION}:${prim.attributes.COLOR_0}:${prim.material}`
+                    : null;
+                if (sharedKey !== null && sharedOffsets.has(sharedKey)) {
+                    const sharedOffset = sharedOffsets.get(sharedKey);
+                    for (const idx of this._lineIndices(gltf, prim, vertices.length / 3)) {
+                        allIndices.push(idx + sharedOffset);
+                    }
+                    continue;
+                }
+                if (sharedKey !== null) {
+                    sharedOffsets.set(sharedKey, vertexOffset);
+                }
+                
                 // Tentar obter cores de COLOR_0 ou do material
                 let colors = null;
                 if (prim.attributes && prim.attributes.COLOR_0 !== undefined) {
@@ -142,18 +159,8 @@ class GLTFLoader {
                 
                 if (colors) hasColors = true;
                 
-                let indices = prim.indices !== undefined 
-                    ? this._getAccessor(gltf, prim.indices) 
-                    : [];
-                
                 const numVertices = vertices.length / 3;
-                
-                // Se não houver indices, gerar sequência
-                if (indices.length === 0 && vertices.length > 0) {
-                    for (let i = 0; i < numVertices; i++) {
-                        indices.push(i);
-                    }
-                }
+                const indices = this._lineIndices(gltf, prim, numVertices);
                 
                 // Aplicar transformações aos vértices (baking)
                 for (let i = 0; i < numVertices; i++) {
@@ -198,10 +205,39 @@ class GLTFLoader {
         return {
             vertices: new Float32Array(allVertices),
             indices: new Uint16Array(allIndices),
-            colors: hasColors ? new Float32Array(allColors) : null
+            colors: hasColors ? new Float32Array(allColors) : null,
+            // Volumes pré-calculados por bounding_volumes.py --embed (se existirem)
+            bounds: gltf.extras && gltf.extras.bounds ? gltf.extras.bounds : null
         };
     }
 
+    /**
+     * Índices de uma primitiva para desenhar com gl.LINES
+     * LINE_STRIP (mode 3) é expandido em pares de segmentos
+     */
+    static _lineIndices(gltf, prim, numVertices) {
+        let indices = prim.indices !== undefined 
+            ? this._getAccessor(gltf, prim.indices) 
+            : [];
+        
+        // Se não houver indices, gerar sequência
+        if (indices.length === 0 && numVertices > 0) {
+            for (let i = 0; i < numVertices; i++) {
+                indices.push(i);
+            }
+        }
+        
+        if (prim.mode === 3) {
+            const pairs = [];
+            for (let i = 0; i < indices.length - 1; i++) {
+                pairs.push(indices[i], indices[i + 1]);
+            }
+            return pairs;
+        }
+        
+        return indices;
+    }
+
     static _getAccessor(gltf, accessorIndex) {
         const accessor = gltf.accessors[accessorIndex];
         const bufferView = gltf.bufferViews[accessor.bufferView];
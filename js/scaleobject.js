@@ -45,8 +45,12 @@ class ScaleObject {
             this.indices = modelData.indices;
             this.colors = modelData.colors || null;
             
-            // Calcula bounding box do modelo
-            this.calculateBoundingBox();
+            // Usa o bounding box pré-calculado se existir, senão calcula
+            if (modelData.bounds && modelData.bounds.modelBoundingSize > 0) {
+                this.modelBoundingSize = modelData.bounds.modelBoundingSize;
+            } else {
+                this.calculateBoundingBox();
+            }
             
             console.log(`✓ Carregado: ${this.name} (${this.vertices.length / 3} vértices, tamanho modelo: ${this.modelBoundingSize.toFixed(4)} unidades)`);
         } catch (error) {
@@ -102,12 +106,12 @@ class ScaleObject {
             const y = this.vertices[i + 1];
             const z = this.vertices[i + 2];
             
-            minX = Math.min(minX, x);
-            minY = Math.min(minY, y);
-            minZ = Math.min(minZ, z);
-            maxX = Math.max(maxX, x);
-            maxY = Math.max(maxY, y);
-            maxZ = Math.max(maxZ, z);
+            if (x < minX) minX = x;
+            if (x > maxX) maxX = x;
+            if (y < minY) minY = y;
+            if (y > maxY) maxY = y;
+            if (z < minZ) minZ = z;
+            if (z > maxZ) maxZ = z;
         }
         
         // Tamanho é a maior dimensão do bounding box
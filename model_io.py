@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Leitura e escrita de modelos (OBJ, GLTF, GLB) partilhada pelas ferramentas Python de Cosmic Scales.
+
+A geometria devolvida por load_geometry() replica o que os carregadores do
+navegador (js/objloader.js e js/gltfloader.js) entregam ao ScaleObject:
+vértices, pares de índices para gl.LINES e cores opcionais.
+"""
+
+import base64
+import json
+import os
+import struct
+import sys
+
+GLB_MAGIC = b'glTF'
+CHUNK_JSON = b'JSON'
+CHUNK_BIN = b'BIN\0'
+
+# Modos de primitiva glTF
+MODE_POINTS = 0
+MODE_LINES = 1
+MODE_LINE_LOOP = 2
+MODE_LINE_STRIP = 3
+MODE_TRIANGLES = 4
+
+# componentType -> (formato struct, bytes por componente)
+COMPONENT_TYPES = {
+    5120: ('b', 1),
+    5121: ('B', 1),
+    5122: ('h', 2),
+    5123: ('H', 2),
+    5125: ('I', 4),
+    5126: ('f', 4),
+}
+
+TYPE_COMPONENTS = {
+    'SCALAR': 1,
+    'VEC2': 2,
+    'VEC3': 3,
+    'VEC4': 4,
+    'MAT2': 4,
+    'MAT3': 9,
+    'MAT4': 16,
+}
+
+QUESTION_MARK_MODEL = 'models/question_mark.obj'
+
+TARGET_ARRAY_BUFFER = 34962
+TARGET_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def pad4(length):
+    """Arredonda um tamanho para o múltiplo de 4 seguinte"""
+    return (length + 3) & ~3
+
+
+def read_glb(filename):
+    """Lê um GLB e devolve (gltf, bin) - bin é None se não houver chunk BIN"""
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    if data[:4] != GLB_MAGIC:
+        raise ValueError(f"Magic number inválido em {filename}")
+
+    length = struct.unpack_from('<I', data, 8)[0]
+    json_length, json_type = struct.unpack_from('<I4s', data, 12)
+    if json_type != CHUNK_JSON:
+        raise ValueError(f"Primeiro chunk não é JSON em {filename}")
+
+    gltf = json.loads(data[20:20 + json_length].decode('utf-8'))
+
+    bin_data = None
+    offset = 20 + json_length
+    if offset + 8 <= min(length, len(data)):
+        bin_length, bin_type = struct.unpack_from('<I4s', data, offset)
+        if bin_type == CHUNK_BIN:
+            bin_data = data[offset + 8:offset + 8 + bin_length]
+
+    return gltf, bin_data
+
+
+def load_gltf(filename):
+    """Carrega um GLTF ou GLB e devolve (gltf, buffers) com o conteúdo de cada buffer em bytes"""
+    ext = os.path.splitext(filename)[1].lower()
+
+    if ext == '.glb':
+        gltf, bin_data = read_glb(filename)
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            gltf = json.load(f)
+        bin_data = None
+
+    model_dir = os.path.dirname(filename)
+    buffers = []
+    for i, buffer in enumerate(gltf.get('buffers', [])):
+        uri = buffer.get('uri')
+        if uri is None:
+            # Em GLB, o buffer 0 sem URI aponta para o chunk BIN
+            buffers.append(bin_data if i == 0 and bin_data is not None else b'')
+        elif uri.startswith('data:'):
+            buffers.append(base64.b64decode(uri.split(',', 1)[1]))
+        else:
+            with open(os.path.join(model_dir, uri), 'rb') as f:
+                buffers.append(f.read())
+
+    return gltf, buffers
+
+
+def read_accessor(gltf, buffers, accessor_index):
+    """Lê um accessor e devolve uma lista de tuplos (um por elemento)"""
+    accessor = gltf['accessors'][accessor_index]
+    comps = TYPE_COMPONENTS[accessor['type']]
+    fmt, size = COMPONENT_TYPES[accessor['componentType']]
+    count = accessor['count']
+
+    if 'bufferView' not in accessor:
+        # Accessor sem bufferView é inicializado a zeros
+        return [(0,) * comps for _ in range(count)]
+
+    view = gltf['bufferViews'][accessor['bufferView']]
+    data = buffers[view['buffer']]
+    base = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    stride = view.get('byteStride') or comps * size
+    element = struct.Struct(f'<{comps}{fmt}')
+
+    return [element.unpack_from(data, base + i * stride) for i in range(count)]
+
+
+def write_glb(filename, gltf, bin_data):
+    """Escreve um GLB com os chunks JSON e BIN alinhados a 4 bytes"""
+    json_bytes = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_bytes += b' ' * (pad4(len(json_bytes)) - len(json_bytes))
+
+    chunks = struct.pack('<I4s', len(json_bytes), CHUNK_JSON) + json_bytes
+    if bin_data:
+        bin_bytes = bin_data + b'\0' * (pad4(len(bin_data)) - len(bin_data))
+        chunks += struct.pack('<I4s', len(bin_bytes), CHUNK_BIN) + bin_bytes
+
+    with open(filename, 'wb') as f:
+        f.write(struct.pack('<4sII', GLB_MAGIC, 2, 12 + len(chunks)))
+        f.write(chunks)
+
+    return 12 + len(chunks)
+
+
+def parse_obj_geometry(filename):
+    """Lê um OBJ tal como OBJLoader.parse: faces viram arestas fechadas e linhas viram pares"""
+    vertices = []
+    indices = []
+
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            parts = line.split()
+            cmd = parts[0]
+
+            if cmd == 'v':
+                vertices.append((float(parts[1]), float(parts[2]), float(parts[3])))
+            elif cmd == 'f':
+                face = [int(p.split('/')[0]) - 1 for p in parts[1:]]
+                for i in range(len(face)):
+                    indices.extend((face[i], face[(i + 1) % len(face)]))
+            elif cmd == 'l':
+                polyline = [int(p.split('/')[0]) - 1 for p in parts[1:]]
+                for i in range(len(polyline) - 1):
+                    indices.extend((polyline[i], polyline[i + 1]))
+
+    return {'vertices': vertices, 'indices': indices, 'colors': None}
+
+
+def primitive_line_indices(gltf, buffers, prim, num_vertices):
+    """Índices de uma primitiva convertidos para pares gl.LINES como faz o GLTFLoader"""
+    if 'indices' in prim:
+        indices = [i[0] for i in read_accessor(gltf, buffers, prim['indices'])]
+    else:
+        indices = list(range(num_vertices))
+
+    if prim.get('mode', MODE_TRIANGLES) == MODE_LINE_STRIP:
+        pairs = []
+        for i in range(len(indices) - 1):
+            pairs.extend((indices[i], indices[i + 1]))
+        return pairs
+
+    return indices
+
+
+def parse_gltf_geometry(filename):
+    """Lê um GLTF/GLB tal como GLTFLoader._extractGeometry (todas as malhas concatenadas)"""
+    gltf, buffers = load_gltf(filename)
+    meshes = gltf.get('meshes', [])
+    if not meshes:
+        raise ValueError(f"Sem meshes em {filename}")
+
+    mesh_nodes = {}
+    for node in gltf.get('nodes', []):
+        if 'mesh' in node:
+            mesh_nodes.setdefault(node['mesh'], []).append(node)
+
+    # Translação média para centrar o modelo
+    avg = [0.0, 0.0, 0.0]
+    node_count = 0
+    for mesh_index in range(len(meshes)):
+        nodes = mesh_nodes.get(mesh_index, [])
+        if nodes and 'translation' in nodes[0]:
+            for k in range(3):
+                avg[k] += nodes[0]['translation'][k]
+            node_count += 1
+    if node_count:
+        avg = [a / node_count for a in avg]
+
+    vertices = []
+    indices = []
+    colors = []
+    has_colors = False
+
+    for mesh_index, mesh in enumerate(meshes):
+        nodes = mesh_nodes.get(mesh_index, [])
+        node = nodes[0] if nodes else {}
+        translation = node.get('translation', [0, 0, 0])
+        scale = node.get('scale', [1, 1, 1])
+        rel = [translation[k] - avg[k] for k in range(3)]
+
+        shared = {}
+        for prim in mesh.get('primitives', []):
+            attributes = prim.get('attributes', {})
+            positions = read_accessor(gltf, buffers, attributes['POSITION']) if 'POSITION' in attributes else []
+
+            # Primitivas da mesma malha com os mesmos vértices (ex.: várias LINE_STRIP)
+            # reutilizam os vértices já adicionados
+            key = (attributes.get('POSITION'), attributes.get('COLOR_0'), prim.get('material'))
+            if key[0] is not None and key in shared:
+                for idx in primitive_line_indices(gltf, buffers, prim, len(positions)):
+                    indices.append(idx + shared[key])
+                continue
+
+            prim_colors = None
+            if 'COLOR_0' in attributes:
+                prim_colors = [c[:3] for c in read_accessor(gltf, buffers, attributes['COLOR_0'])]
+            elif 'material' in prim and prim['material'] < len(gltf.get('materials', [])):
+                pbr = gltf['materials'][prim['material']].get('pbrMetallicRoughness', {})
+                base_color = tuple(pbr.get('baseColorFactor', [1, 1, 1, 1])[:3])
+                prim_colors = [base_color] * len(positions)
+
+            if prim_colors is not None:
+                has_colors = True
+                colors.extend(prim_colors)
+            else:
+                colors.extend([(1.0, 1.0, 1.0)] * len(positions))
+
+            offset = len(vertices)
+            shared[key] = offset
+            for p in positions:
+                vertices.append((p[0] * scale[0] + rel[0],
+                                 p[1] * scale[1] + rel[1],
+                                 p[2] * scale[2] + rel[2]))
+
+            for idx in primitive_line_indices(gltf, buffers, prim, len(positions)):
+                indices.append(idx + offset)
+
+    return {'vertices': vertices, 'indices': indices, 'colors': colors if has_colors else None}
+
+
+def load_geometry(filename):
+    """Carrega um modelo (OBJ, GLTF ou GLB) como o navegador o vê"""
+    ext = os.path.splitext(filename)[1].lower()
+
+    if ext == '.obj':
+        return parse_obj_geometry(filename)
+    if ext in ('.gltf', '.glb'):
+        return parse_gltf_geometry(filename)
+
+    raise ValueError(f"Formato não suportado: {ext}")
+
+
+def fallback_path(path):
+    """Caminho do ficheiro fallback (como ModelLoader.getFallbackPath)"""
+    base, ext = os.path.splitext(path)
+    return f"{base}_fallback{ext}"
+
+
+def load_geometry_with_fallback(model_path):
+    """Carrega um modelo com a cadeia do navegador: original → _fallback → ponto de interrogação
+
+    Devolve (caminho usado, geometria) ou (None, None) se nada puder ser lido.
+    """
+    for candidate in (model_path, fallback_path(model_path), QUESTION_MARK_MODEL):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            return candidate, load_geometry(candidate)
+        except Exception as e:
+            print(f"  ⚠️  Erro ao ler {candidate}: {e}")
+    return None, None
+
+
+def morton_code(x, y, z, bits=10):
+    """Código de Morton (Z-order) de um ponto com coordenadas inteiras de 'bits' bits"""
+    code = 0
+    for i in range(bits):
+        code |= ((x >> i) & 1) << (3 * i + 2)
+        code |= ((y >> i) & 1) << (3 * i + 1)
+        code |= ((z >> i) & 1) << (3 * i)
+    return code
+
+
+def hilbert_code(x, y, z, bits=10):
+    """Índice na curva de Hilbert 3D (algoritmo de Skilling) de um ponto inteiro de 'bits' bits"""
+    axes = [x, y, z]
+    top = 1 << (bits - 1)
+
+    # Desfaz as rotações/reflexões de cada nível
+    q = top
+    while q > 1:
+        p = q - 1
+        for i in range(3):
+            if axes[i] & q:
+                axes[0] ^= p
+            else:
+                t = (axes[0] ^ axes[i]) & p
+                axes[0] ^= t
+                axes[i] ^= t
+        q >>= 1
+
+    # Codificação Gray
+    for i in range(1, 3):
+        axes[i] ^= axes[i - 1]
+    t = 0
+    q = top
+    while q > 1:
+        if axes[2] & q:
+            t ^= q - 1
+        q >>= 1
+    for i in range(3):
+        axes[i] ^= t
+
+    # Intercala os bits (forma transposta → índice)
+    code = 0
+    for b in range(bits - 1, -1, -1):
+        for i in range(3):
+            code = (code << 1) | ((axes[i] >> b) & 1)
+    return code
+
+
+def quantize(vertex, bounds_min, extent, bits=10):
+    """Quantiza um vértice para inteiros de 'bits' bits dentro do bounding box"""
+    top = (1 << bits) - 1
+    return tuple(
+        min(top, max(0, int((vertex[k] - bounds_min[k]) / extent * top + 0.5))) if extent else 0
+        for k in range(3)
+    )
+
+
+MODEL_EXTENSIONS = ('.obj', '.gltf', '.glb')
+
+
+def find_model_files(directory='models'):
+    """Lista os modelos OBJ/GLTF/GLB de uma pasta, ordenados
+
+    Define os ficheiros que as ferramentas e o validate_models.py veem:
+    extensão sem distinção de maiúsculas, pasta inexistente → lista vazia.
+    """
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for name in os.listdir(directory):
+        if os.path.splitext(name)[1].lower() in MODEL_EXTENSIONS:
+            files.append(os.path.join(directory, name))
+    return sorted(files)
+
+
+def colors_path(filename):
+    """Cores por vértice de um OBJ (ex.: ball.obj → ball_colors.json)"""
+    return os.path.splitext(filename)[0] + '_colors.json'
+
+
+def reorder_colors(colors, remap):
+    """Remapeia as chaves (índices base 1) de um ficheiro _colors.json"""
+    result = {}
+    for key, value in colors.items():
+        old = int(key) - 1
+        result[str(remap[old] + 1) if 0 <= old < len(remap) else key] = value
+    return dict(sorted(result.items(), key=lambda item: int(item[0])))
+
+
+def option(name, default=None, argv=None):
+    """Valor da opção '--nome valor' na linha de comando (ou default)"""
+    argv = sys.argv if argv is None else argv
+    if name in argv:
+        idx = argv.index(name)
+        if idx + 1 < len(argv):
+            return argv[idx + 1]
+    return default
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Servidor local de pré-visualização (asyncio) para Cosmic Scales
+
+Serve index.html, config.json e a pasta models/ com:
+- ETag calculado a partir de um hash do conteúdo (em cache por mtime/tamanho)
+- Respostas 304 para pedidos condicionais (If-None-Match)
+- Variantes pré-comprimidas .br/.gz quando existem e o cliente as aceita
+- Pedidos parciais (Range) para transmitir GLB grandes por partes
+- Log da latência de cada pedido, para medir o carregamento a frio das escalas
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import sys
+import time
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+
+CHUNK_SIZE = 64 * 1024
+
+# Intervalo bem formado mas fora do ficheiro (resposta 416)
+UNSATISFIABLE = 'unsatisfiable'
+
+# Variantes pré-comprimidas, por ordem de preferência
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+CONTENT_TYPES = {
+    '.glb': 'model/gltf-binary',
+    '.gltf': 'model/gltf+json',
+    '.obj': 'text/plain; charset=utf-8',
+    '.json': 'application/json; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+}
+
+REASONS = {
+    200: 'OK',
+    206: 'Partial Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable',
+}
+
+
+def hash_file(path):
+    """ETag a partir do SHA-1 do conteúdo (leitura bloqueante, corre numa thread)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+class ETagCache:
+    """Cache de ETags por caminho, invalidada quando mtime ou tamanho mudam
+
+    O hash corre fora do event loop, para um GLB grande a frio não parar as
+    outras ligações; pedidos simultâneos ao mesmo ficheiro partilham o cálculo.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, path, stat):
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != key:
+            entry = (key, asyncio.ensure_future(asyncio.to_thread(hash_file, path)))
+            self.entries[path] = entry
+        try:
+            return await asyncio.shield(entry[1])
+        except Exception:
+            # Não guardar falhas (ex.: ficheiro apagado a meio)
+            if self.entries.get(path) is entry:
+                del self.entries[path]
+            raise
+
+
+def content_type(path):
+    """Tipo MIME de um ficheiro (com os formatos de modelo conhecidos)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def parse_range(header, size):
+    """Interpreta 'Range: bytes=a-b' e devolve (início, fim) inclusivo
+
+    Devolve None para cabeçalhos mal formados ou com vários intervalos (o pedido
+    é tratado como um GET normal, como a RFC 9110 permite) e UNSATISFIABLE para
+    um intervalo válido que não cabe no ficheiro (416).
+    """
+    if not header.startswith('bytes=') or ',' in header:
+        return None  # Apenas um intervalo é suportado
+
+    start, sep, end = header[6:].strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if start == '':
+            # Sufixo: últimos N bytes
+            length = int(end)
+            if length < 0:
+                return None
+            if length == 0 or size == 0:
+                return UNSATISFIABLE
+            return max(0, size - length), size - 1
+        first = int(start)
+        last = int(end) if end else None
+    except ValueError:
+        return None
+
+    if first < 0 or (last is not None and last < first):
+        return None
+    if first >= size:
+        return UNSATISFIABLE
+    return first, size - 1 if last is None else min(last, size - 1)
+
+
+def accepted_encodings(header):
+    """Codificações de Accept-Encoding com q > 0 (q=0 significa recusada)"""
+    accepted = set()
+    for item in header.split(','):
+        coding, *params = [p.strip() for p in item.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def etag_matches(header, etag):
+    """Verifica If-None-Match (lista de ETags ou '*')"""
+    if header.strip() == '*':
+        return True
+    tags = [t.strip() for t in header.split(',')]
+    return etag in tags or f'W/{etag}' in tags
+
+
+class PreviewServer:
+    """Servidor HTTP/1.1 mínimo com keep-alive"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.etags = ETagCache()
+        self.first_request = None
+
+    def resolve(self, url_path):
+        """Converte o caminho do URL num ficheiro dentro da raiz (ou None)"""
+        path = unquote(urlsplit(url_path).path)
+        # Nunca servir ficheiros ou pastas ocultos (.git, .env, ...)
+        if any(segment.startswith('.') for segment in path.split('/')):
+            return None
+        if path.endswith('/'):
+            path += 'index.html'
+        full = os.path.abspath(os.path.join(self.root, path.lstrip('/')))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None
+        return full
+
+    def select_variant(self, path, accept_encoding, has_range):
+        """Escolhe a variante pré-comprimida aceite pelo cliente, se existir"""
+        if has_range:
+            # Intervalos referem-se sempre aos bytes originais
+            return path, None
+
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+    async def handle(self, reader, writer):
+        """Atende os pedidos de uma ligação"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                if self.first_request is None:
+                    self.first_request = start
+
+                keep_alive = await self.respond(writer, request_line.decode('latin-1').strip(), headers, start)
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, request_line, headers, start):
+        """Responde a um pedido e devolve se a ligação deve continuar aberta"""
+        parts = request_line.split()
+        if len(parts) != 3:
+            await self.send(writer, 400, {}, b'', 'HEAD', request_line, start)
+            return False
+
+        method, target, version = parts
+        keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+        if method not in ('GET', 'HEAD'):
+            await self.send(writer, 405, {'Allow': 'GET, HEAD'}, b'', method, target, start)
+            return keep_alive
+
+        path = self.resolve(target)
+        if path is None:
+            await self.send(writer, 403, {}, b'', method, target, start)
+            return keep_alive
+        if not os.path.isfile(path):
+            await self.send(writer, 404, {}, b'', method, target, start)
+            return keep_alive
+
+        byte_range = None
+        if 'range' in headers:
+            # Intervalos referem-se sempre aos bytes do ficheiro original
+            byte_range = parse_range(headers['range'], os.stat(path).st_size)
+        if byte_range is not None and 'if-range' in headers:
+            # If-Range com ETag diferente: devolve o ficheiro inteiro
+            if headers['if-range'] != await self.etags.get(path, os.stat(path)):
+                byte_range = None
+
+        variant, encoding = self.select_variant(path, headers.get('accept-encoding', ''), byte_range is not None)
+        stat = os.stat(variant)
+        etag = await self.etags.get(variant, stat)
+
+        response_headers = {
+            'Content-Type': content_type(path),
+            'ETag': etag,
+            'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+            'Cache-Control': 'no-cache',
+            'Accept-Ranges': 'bytes',
+            'Vary': 'Accept-Encoding',
+        }
+        if encoding:
+            response_headers['Content-Encoding'] = encoding
+
+        if 'if-none-match' in headers and etag_matches(headers['if-none-match'], etag):
+            await self.send(writer, 304, response_headers, b'', method, target, start)
+            return keep_alive
+
+        size = stat.st_size
+        first, last = 0, size - 1
+        status = 200
+        if byte_range is not None:
+            if byte_range == UNSATISFIABLE:
+                response_headers['Content-Range'] = f'bytes */{size}'
+                await self.send(writer, 416, response_headers, b'', method, target, start)
+                return keep_alive
+            first, last = byte_range
+            status = 206
+            response_headers['Content-Range'] = f'bytes {first}-{last}/{size}'
+
+        length = last - first + 1 if size else 0
+        response_headers['Content-Length'] = str(length)
+        self.write_head(writer, status, response_headers)
+
+        if method == 'GET' and length:
+            # Leituras do disco numa thread, para não bloquear o event loop
+            f = await asyncio.to_thread(open, variant, 'rb')
+            try:
+                await asyncio.to_thread(f.seek, first)
+                remaining = length
+                while remaining:
+                    chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    remaining -= len(chunk)
+                    await writer.drain()
+            finally:
+                f.close()
+        await writer.drain()
+
+        self.log(method, target, status, length if method == 'GET' else 0, encoding, start)
+        return keep_alive
+
+    def write_head(self, writer, status, headers):
+        """Escreve a linha de estado e os cabeçalhos"""
+        lines = [f'HTTP/1.1 {status} {REASONS[status]}',
+                 f'Date: {formatdate(usegmt=True)}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+    async def send(self, writer, status, headers, body, method, target, start):
+        """Envia uma resposta sem ficheiro (erros e 304)"""
+        if status != 304:
+            headers = dict(headers, **{'Content-Length': str(len(body))})
+        self.write_head(writer, status, headers)
+        if method != 'HEAD':
+            writer.write(body)
+        await writer.drain()
+        self.log(method, target, status, len(body), headers.get('Content-Encoding'), start)
+
+    def log(self, method, target, status, length, encoding, start):
+        """Mostra a latência do pedido e o tempo desde o primeiro pedido"""
+        now = time.perf_counter()
+        latency = (now - start) * 1000
+        elapsed = (now - self.first_request) * 1000
+        icon = '✓' if status < 400 else '❌'
+        enc = f' [{encoding}]' if encoding else ''
+        print(f"{icon} {status} {method} {target}{enc} - {length} bytes "
+              f"em {latency:.1f} ms (t+{elapsed:.0f} ms)")
+
+
+async def serve(root, host, port):
+    """Arranca o servidor e fica à espera de ligações"""
+    server = PreviewServer(root)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"🌐 A servir {server.root} em http://{host}:{port}/ (Ctrl+C para terminar)")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    """Função principal"""
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Servidor Local de Pré-visualização           ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python preview_server.py [opções]
+
+Opções:
+  --port <porta>    Porta (padrão: 8000)
+  --host <host>     Interface (padrão: 127.0.0.1)
+  --root <pasta>    Pasta a servir (padrão: pasta do script)
+
+Exemplos:
+  python preview_server.py
+  python preview_server.py --port 8080 --host 0.0.0.0
+        """)
+        return
+
+    options = {'--port': '8000', '--host': '127.0.0.1',
+               '--root': os.path.dirname(os.path.abspath(__file__))}
+    for name in options:
+        if name in sys.argv:
+            idx = sys.argv.index(name)
+            if idx + 1 < len(sys.argv):
+                options[name] = sys.argv[idx + 1]
+
+    try:
+        asyncio.run(serve(options['--root'], options['--host'], int(options['--port'])))
+    except KeyboardInterrupt:
+        print("\n✓ Servidor terminado")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Exportação progressiva (do grosseiro para o detalhado) de modelos wireframe
+
+Hoje cada modelo é descarregado e interpretado por inteiro antes de
+ScaleObject.createBuffers enviar algo para a GPU. Este utilitário reordena
+vértices e arestas para que qualquer prefixo dos buffers seja uma versão
+grosseira válida do modelo:
+- Os vértices recebem um nível por agrupamento em grelha (vertex clustering):
+  o nível L tem um vértice representante por célula de uma grelha 2^L x 2^L x 2^L
+- Dentro de cada nível, os vértices são ordenados pelo código de Morton
+- As arestas são ordenadas pelo maior índice que referenciam, por isso um
+  prefixo de índices só usa vértices de um prefixo de vértices
+
+A exportação inclui uma tabela de contagens de prefixo por nível
+(no extras da primitiva GLB ou num ficheiro _levels.json ao lado do OBJ),
+e --validate verifica que cada prefixo só referencia vértices já recebidos.
+"""
+
+import json
+import os
+import struct
+import sys
+
+from model_io import (
+    MODE_LINES, TARGET_ARRAY_BUFFER, TARGET_ELEMENT_ARRAY_BUFFER,
+    colors_path, load_geometry, load_gltf, morton_code, option, pad4, quantize, reorder_colors, write_glb,
+)
+from stitch_lines import unique_edges
+
+MAX_LEVEL = 10
+
+
+def cell_of(vertex, bounds_min, extent, level):
+    """Célula da grelha 2^level que contém o vértice"""
+    cells = 1 << level
+    return tuple(
+        min(cells - 1, int((vertex[k] - bounds_min[k]) / extent * cells)) if extent else 0
+        for k in range(3)
+    )
+
+
+def vertex_levels(vertices, bounds_min, extent):
+    """Atribui a cada vértice o nível mais grosseiro em que representa a sua célula"""
+    levels = [None] * len(vertices)
+    assigned = []
+
+    for level in range(MAX_LEVEL + 1):
+        claimed = set()
+        # Representantes de níveis mais grosseiros mantêm a sua célula
+        for v in assigned:
+            claimed.add(cell_of(vertices[v], bounds_min, extent, level))
+        for v, vertex in enumerate(vertices):
+            if levels[v] is not None:
+                continue
+            cell = cell_of(vertex, bounds_min, extent, level)
+            if cell not in claimed:
+                claimed.add(cell)
+                levels[v] = level
+                assigned.append(v)
+        if len(assigned) == len(vertices):
+            break
+
+    # Vértices coincidentes ficam num último nível
+    return [MAX_LEVEL + 1 if level is None else level for level in levels]
+
+
+def progressive_order(geometry):
+    """Calcula a nova ordem de vértices e arestas e a tabela de prefixos por nível"""
+    vertices = geometry['vertices']
+    edges = unique_edges(geometry['indices'])
+    if not vertices:
+        return [], [], []
+
+    bounds_min = [min(v[k] for v in vertices) for k in range(3)]
+    extent = max(max(v[k] for v in vertices) - bounds_min[k] for k in range(3))
+
+    levels = vertex_levels(vertices, bounds_min, extent)
+    order = sorted(range(len(vertices)),
+                   key=lambda v: (levels[v], morton_code(*quantize(vertices[v], bounds_min, extent))))
+    remap = [0] * len(vertices)
+    for new, old in enumerate(order):
+        remap[old] = new
+
+    new_edges = []
+    for a, b in edges:
+        a, b = remap[a], remap[b]
+        new_edges.append((a, b) if a < b else (b, a))
+    new_edges.sort(key=lambda e: (e[1], e[0]))
+
+    # Tabela de prefixos: nº de vértices até ao nível e nº de índices que só os usam
+    table = []
+    edge_count = 0
+    vertex_count = 0
+    for level in sorted(set(levels)):
+        vertex_count += levels.count(level)
+        while edge_count < len(new_edges) and new_edges[edge_count][1] < vertex_count:
+            edge_count += 1
+        table.append({'level': level, 'vertexCount': vertex_count, 'indexCount': edge_count * 2})
+
+    return order, new_edges, table
+
+
+def write_obj_progressive(filename, vertices, edges, table):
+    """Escreve o OBJ reordenado e a tabela de níveis em <nome>_levels.json"""
+    with open(filename, 'w') as f:
+        f.write("# Progressive order by Cosmic Scales utility\n\n")
+
+        f.write("# Vertices\n")
+        for v in vertices:
+            f.write(f"v {v[0]:.6f} {v[1]:.6f} {v[2]:.6f}\n")
+
+        f.write("\n# Lines\n")
+        for a, b in edges:
+            f.write(f"l {a + 1} {b + 1}\n")
+
+    levels_file = levels_path(filename)
+    with open(levels_file, 'w', encoding='utf-8') as f:
+        json.dump({'levels': table}, f, indent=2)
+    return levels_file
+
+
+def write_glb_progressive(filename, vertices, colors, edges, table):
+    """Escreve um GLB com uma primitiva LINES e a tabela de níveis em extras"""
+    positions = b''.join(struct.pack('<3f', *v) for v in vertices)
+    index_format, component_type = ('H', 5123) if len(vertices) <= 65535 else ('I', 5125)
+    flat = [i for edge in edges for i in edge]
+    index_data = struct.pack(f'<{len(flat)}{index_format}', *flat)
+
+    accessors = [{
+        'bufferView': 0,
+        'componentType': 5126,
+        'count': len(vertices),
+        'type': 'VEC3',
+        'min': [min(v[k] for v in vertices) for k in range(3)],
+        'max': [max(v[k] for v in vertices) for k in range(3)],
+    }]
+    buffer_views = [{'buffer': 0, 'byteOffset': 0, 'byteLength': len(positions), 'target': TARGET_ARRAY_BUFFER}]
+    attributes = {'POSITION': 0}
+    data = positions
+
+    if colors:
+        color_data = b''.join(struct.pack('<3f', *c[:3]) for c in colors)
+        buffer_views.append({'buffer': 0, 'byteOffset': len(data), 'byteLength': len(color_data),
+                             'target': TARGET_ARRAY_BUFFER})
+        accessors.append({'bufferView': 1, 'componentType': 5126, 'count': len(colors), 'type': 'VEC3'})
+        attributes['COLOR_0'] = 1
+        data += color_data
+
+    buffer_views.append({'buffer': 0, 'byteOffset': len(data), 'byteLength': len(index_data),
+                         'target': TARGET_ELEMENT_ARRAY_BUFFER})
+    accessors.append({'bufferView': len(buffer_views) - 1, 'componentType': component_type,
+                      'count': len(flat), 'type': 'SCALAR'})
+    data += index_data
+
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'Cosmic Scales progressive_mesh.py'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0}],
+        'meshes': [{'primitives': [{
+            'attributes': attributes,
+            'indices': len(accessors) - 1,
+            'mode': MODE_LINES,
+            'extras': {'progressiveLevels': table},
+        }]}],
+        'accessors': accessors,
+        'bufferViews': buffer_views,
+        'buffers': [{'byteLength': pad4(len(data))}],
+    }
+    return write_glb(filename, gltf, data)
+
+
+def write_obj_colors(input_file, output_file, order):
+    """Remapeia o <modelo>_colors.json do original para a nova ordem de vértices"""
+    source = colors_path(input_file)
+    if not os.path.exists(source):
+        return None
+
+    with open(source, 'r', encoding='utf-8') as f:
+        colors = json.load(f)
+    remap = [0] * len(order)
+    for new, old in enumerate(order):
+        remap[old] = new
+
+    target = colors_path(output_file)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(reorder_colors(colors, remap), f)
+    return target
+
+
+def levels_path(filename):
+    """Ficheiro com a tabela de níveis de um OBJ (ex.: sun.obj → sun_levels.json)"""
+    return os.path.splitext(filename)[0] + '_levels.json'
+
+
+def read_levels(filename):
+    """Lê a tabela de níveis de um ficheiro exportado"""
+    if os.path.splitext(filename)[1].lower() == '.obj':
+        with open(levels_path(filename), 'r', encoding='utf-8') as f:
+            return json.load(f)['levels']
+
+    gltf, _ = load_gltf(filename)
+    return gltf['meshes'][0]['primitives'][0]['extras']['progressiveLevels']
+
+
+def validate_progressive(filename):
+    """Verifica que cada prefixo de índices só referencia vértices do prefixo correspondente"""
+    print(f"\n🔍 Validando ordem progressiva: {filename}")
+
+    try:
+        geometry = load_geometry(filename)
+        table = read_levels(filename)
+    except Exception as e:
+        print(f"  ❌ ERRO: {e}")
+        return False
+
+    indices = geometry['indices']
+    num_vertices = len(geometry['vertices'])
+    ok = True
+
+    # Cada aresta referencia no máximo o vértice mais alto já usado pela seguinte
+    running_max = -1
+    for k in range(0, len(indices) - 1, 2):
+        edge_max = max(indices[k], indices[k + 1])
+        if edge_max < running_max:
+            print(f"  ❌ Aresta {k // 2} usa o vértice {edge_max} depois de uma aresta com {running_max}")
+            ok = False
+            break
+        running_max = edge_max
+
+    previous = (0, 0)
+    for entry in table:
+        vertex_count, index_count = entry['vertexCount'], entry['indexCount']
+        prefix = indices[:index_count]
+        if vertex_count < previous[0] or index_count < previous[1]:
+            print(f"  ❌ Nível {entry['level']}: contagens não são crescentes")
+            ok = False
+        elif prefix and max(prefix) >= vertex_count:
+            print(f"  ❌ Nível {entry['level']}: índice {max(prefix)} fora do prefixo de {vertex_count} vértices")
+            ok = False
+        else:
+            print(f"  ✓ Nível {entry['level']}: {vertex_count} vértices, {index_count} índices")
+        previous = (vertex_count, index_count)
+
+    if not table or previous != (num_vertices, len(indices)):
+        print(f"  ❌ Último nível ({previous}) não cobre o modelo ({num_vertices}, {len(indices)})")
+        ok = False
+
+    if ok:
+        print("  ✓ Todos os prefixos são válidos")
+    return ok
+
+
+def export_progressive(input_file, output_file):
+    """Reordena um modelo e grava a versão progressiva"""
+    print(f"\n🔧 Ordenação progressiva: {input_file}")
+
+    geometry = load_geometry(input_file)
+    order, edges, table = progressive_order(geometry)
+    vertices = [geometry['vertices'][v] for v in order]
+
+    if os.path.splitext(output_file)[1].lower() == '.glb':
+        colors = [geometry['colors'][v] for v in order] if geometry['colors'] else None
+        write_glb_progressive(output_file, vertices, colors, edges, table)
+    else:
+        levels_file = write_obj_progressive(output_file, vertices, edges, table)
+        print(f"✓ Tabela de níveis salva em: {levels_file}")
+        colors_file = write_obj_colors(input_file, output_file, order)
+        if colors_file:
+            print(f"✓ Cores remapeadas salvas em: {colors_file}")
+
+    for entry in table:
+        print(f"  Nível {entry['level']:2d}: {entry['vertexCount']:6d} vértices, {entry['indexCount']:6d} índices")
+    print(f"✓ Modelo progressivo salvo em: {output_file}")
+    return True
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Ordenação Progressiva de Modelos              ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python progressive_mesh.py <modelo> [--output <arquivo>]
+  python progressive_mesh.py --validate <arquivo>
+
+Opções:
+  --output <arquivo>   .obj (com _levels.json) ou .glb (níveis em extras)
+                       Padrão: <modelo>_progressive.obj
+  --validate           Verifica os prefixos de um ficheiro exportado
+
+Exemplos:
+  python progressive_mesh.py models/sun.obj
+  python progressive_mesh.py models/sun.obj --output models/sun_progressive.glb
+  python progressive_mesh.py --validate models/sun_progressive.glb
+        """)
+        return 0
+
+    if sys.argv[1] == '--validate':
+        files = sys.argv[2:]
+        results = [validate_progressive(f) for f in files]
+        return 0 if files and all(results) else 1
+
+    input_file = sys.argv[1]
+    if not os.path.exists(input_file):
+        print(f"❌ Arquivo não encontrado: {input_file}")
+        return 1
+
+    output_file = option('--output', f"{os.path.splitext(input_file)[0]}_progressive.obj")
+
+    export_progressive(input_file, output_file)
+    return 0 if validate_progressive(output_file) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
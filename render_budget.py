@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Relatório de orçamento de renderização por escala para Cosmic Scales
+
+O AnimationController faz crossfade entre duas escalas, por isso durante uma
+transição são desenhados dois ScaleObject no mesmo frame. Com o slider e o
+play as escalas são vizinhas, mas um clique na lista de objetos
+(jumpToScaleImmediate) faz crossfade entre quaisquer duas. Este relatório
+lê o config.json e as estatísticas de cada modelo (com a mesma cadeia de
+fallback do navegador) e calcula, para cada janela de transição, o total de
+vértices, segmentos e bytes dos buffers de vértices, índices e cores.
+Janelas acima dos orçamentos configurados são assinaladas e o processo termina
+com código 1, para uso em CI.
+"""
+
+import json
+import os
+import sys
+
+from model_io import load_geometry_with_fallback, option
+
+# Orçamentos padrão
+DEFAULT_MAX_SEGMENTS = 50000           # Segmentos gl.LINES por frame
+DEFAULT_MAX_FRAME_BYTES = 4 * 1024**2  # Bytes de buffers lidos por frame
+DEFAULT_MAX_VRAM = 64 * 1024**2        # Bytes de todos os buffers carregados
+
+FLOAT_BYTES = 4
+INDEX_BYTES = 2  # Uint16Array em ScaleObject.createBuffers
+
+
+def model_stats(model_path):
+    """Estatísticas de GPU de um modelo, seguindo a cadeia original → _fallback → ponto de interrogação"""
+    used, geometry = load_geometry_with_fallback(model_path)
+    if geometry is None:
+        return None
+
+    num_vertices = len(geometry['vertices'])
+    num_indices = len(geometry['indices'])
+    return {
+        'model': used,
+        'fallback': used != model_path,
+        'vertices': num_vertices,
+        'segments': num_indices // 2,
+        'vertex_bytes': num_vertices * 3 * FLOAT_BYTES,
+        'index_bytes': num_indices * INDEX_BYTES,
+        'color_bytes': num_vertices * 3 * FLOAT_BYTES if geometry['colors'] else 0,
+    }
+
+
+def total_bytes(stats):
+    """Bytes de todos os buffers WebGL de um objeto"""
+    return stats['vertex_bytes'] + stats['index_bytes'] + stats['color_bytes']
+
+
+def transition_windows(scales):
+    """Janelas de renderização: cada escala sozinha e cada par de escalas em crossfade
+
+    Inclui todos os pares, não só as vizinhas, porque jumpToScaleImmediate
+    pode juntar quaisquer duas escalas no mesmo frame.
+    """
+    windows = [(i,) for i in range(len(scales))]
+    windows += [(i, j) for i in range(len(scales)) for j in range(i + 1, len(scales))]
+    return sorted(windows)
+
+
+def is_neighbour_window(window):
+    """Janela percorrida pelo slider/play (escala sozinha ou par de vizinhas)"""
+    return len(window) == 1 or window[1] == window[0] + 1
+
+
+def build_report(config, max_segments, max_frame_bytes, max_vram):
+    """Calcula as estatísticas por escala e por janela de transição"""
+    cache = {}
+    scales = []
+    for scale in config.get('scales', []):
+        path = scale.get('model', '')
+        if path not in cache:
+            cache[path] = model_stats(path)
+        scales.append({'name': scale.get('name', path), 'stats': cache[path]})
+
+    windows = []
+    for window in transition_windows(scales):
+        members = [scales[i]['stats'] for i in window if scales[i]['stats']]
+        combined = {
+            'scales': window,
+            'neighbours': is_neighbour_window(window),
+            'vertices': sum(s['vertices'] for s in members),
+            'segments': sum(s['segments'] for s in members),
+            'vertex_bytes': sum(s['vertex_bytes'] for s in members),
+            'index_bytes': sum(s['index_bytes'] for s in members),
+            'color_bytes': sum(s['color_bytes'] for s in members),
+        }
+        combined['bytes'] = total_bytes(combined)
+
+        problems = []
+        if combined['segments'] > max_segments:
+            problems.append(f"segmentos {combined['segments']} > {max_segments}")
+        if combined['bytes'] > max_frame_bytes:
+            problems.append(f"bytes {combined['bytes']} > {max_frame_bytes}")
+        combined['problems'] = problems
+        windows.append(combined)
+
+    # Todos os objetos ficam com buffers na GPU depois de loadObjects()
+    vram = sum(total_bytes(s['stats']) for s in scales if s['stats'])
+
+    return {
+        'scales': scales,
+        'windows': windows,
+        'vram': vram,
+        'vram_over': vram > max_vram,
+        'missing': [s['name'] for s in scales if s['stats'] is None],
+    }
+
+
+def format_bytes(n):
+    """Formata um número de bytes"""
+    if n >= 1024**2:
+        return f"{n / 1024**2:.2f} MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n} B"
+
+
+def print_report(report, max_vram):
+    """Mostra o relatório"""
+    print("\n📦 Escalas:")
+    for i, scale in enumerate(report['scales']):
+        stats = scale['stats']
+        if stats is None:
+            print(f"  {i:2d}. ❌ {scale['name']}: nenhum modelo disponível")
+            continue
+        note = f" (fallback: {stats['model']})" if stats['fallback'] else ''
+        print(f"  {i:2d}. {scale['name']}: {stats['vertices']} vértices, "
+              f"{stats['segments']} segmentos, {format_bytes(total_bytes(stats))}{note}")
+        if stats['vertices'] > 65535:
+            print("      ❌ Mais de 65535 vértices (limite do Uint16Array)")
+
+    print("\n🎬 Janelas de renderização (slider/play):")
+    peak = max(report['windows'], key=lambda w: (w['segments'], w['bytes']), default=None)
+    jumps = [w for w in report['windows'] if not w['neighbours']]
+    # Saltos pela lista: só os que excedem o orçamento são listados
+    shown = [w for w in report['windows'] if w['neighbours'] or w['problems']]
+    for window in shown:
+        names = ' + '.join(str(i) for i in window['scales'])
+        icon = '❌' if window['problems'] else '✓'
+        print(f"  {icon} [{names}] {window['vertices']} vértices, {window['segments']} segmentos, "
+              f"V {format_bytes(window['vertex_bytes'])} / I {format_bytes(window['index_bytes'])} / "
+              f"C {format_bytes(window['color_bytes'])}")
+        for problem in window['problems']:
+            print(f"      ⚠️  Acima do orçamento: {problem}")
+
+    if jumps:
+        over = sum(1 for w in jumps if w['problems'])
+        icon = '❌' if over else '✓'
+        print(f"  {icon} {len(jumps)} saltos pela lista de objetos verificados, {over} acima do orçamento")
+
+    if peak:
+        names = ' + '.join(report['scales'][i]['name'] for i in peak['scales'])
+        print(f"\n📈 Pico: {names} ({peak['segments']} segmentos, {format_bytes(peak['bytes'])})")
+
+    icon = '❌' if report['vram_over'] else '✓'
+    print(f"{icon} VRAM total dos buffers: {format_bytes(report['vram'])} (orçamento {format_bytes(max_vram)})")
+
+
+def main():
+    """Função principal"""
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Orçamento de Renderização por Escala         ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python render_budget.py [opções]
+
+Opções:
+  --config <arquivo>         Configuração a analisar (padrão: config.json)
+  --max-segments <n>         Segmentos por frame (padrão: 50000)
+  --max-frame-bytes <n>      Bytes de buffers por frame (padrão: 4 MB)
+  --max-vram <n>             Bytes de todos os buffers carregados (padrão: 64 MB)
+  --json <arquivo>           Grava também o relatório em JSON
+
+Termina com código 1 se algum orçamento for excedido.
+        """)
+        return 0
+
+    config_file = option('--config', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json'))
+    max_segments = int(option('--max-segments', DEFAULT_MAX_SEGMENTS))
+    max_frame_bytes = int(option('--max-frame-bytes', DEFAULT_MAX_FRAME_BYTES))
+    max_vram = int(option('--max-vram', DEFAULT_MAX_VRAM))
+
+    if not os.path.exists(config_file):
+        print(f"❌ Arquivo não encontrado: {config_file}")
+        return 1
+
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    json_file = option('--json', None)
+    if json_file:
+        json_file = os.path.abspath(json_file)
+
+    # Os caminhos dos modelos são relativos à pasta do config.json (como no navegador)
+    os.chdir(os.path.dirname(os.path.abspath(config_file)))
+
+    print(f"📊 Orçamento de renderização: {config_file}")
+    print("=" * 60)
+
+    report = build_report(config, max_segments, max_frame_bytes, max_vram)
+    print_report(report, max_vram)
+
+    if json_file:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✓ Relatório salvo em: {json_file}")
+
+    over = [w for w in report['windows'] if w['problems']]
+    if over or report['vram_over'] or report['missing']:
+        print(f"\n❌ {len(over)} janela(s) acima do orçamento"
+              + (", VRAM acima do orçamento" if report['vram_over'] else '')
+              + (f", {len(report['missing'])} escala(s) sem modelo" if report['missing'] else ''))
+        return 1
+
+    print("\n✓ Todas as janelas dentro do orçamento")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
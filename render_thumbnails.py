@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Renderizador headless (CPU) de miniaturas wireframe para Cosmic Scales
+
+CosmicScalesApp.loadObjects espera por todos os modelos antes de esconder o
+ecrã de carregamento, por isso o primeiro frame depende do modelo mais lento.
+Este utilitário rasteriza cada escala do config.json em Python puro, com a
+mesma câmara, FOV e escala na grelha que o renderScene() usa no início, e
+grava uma PNG por escala ou um atlas de sprites com índice JSON. A página pode
+mostrar a miniatura de imediato e trocar pela malha real quando esta estiver
+carregada. Não precisa de GPU nem de ecrã; os modelos são processados em
+paralelo.
+"""
+
+import json
+import math
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from model_io import load_geometry_with_fallback, option
+
+# Câmara por omissão (AnimationController.camera.distance e main.js renderScene)
+CAMERA_DISTANCE = 8.0
+CAMERA_HEIGHT = 0.3
+FOV = 45 * math.pi / 180
+NEAR = 0.1
+
+DEFAULT_SIZE = 128
+DEFAULT_SUPERSAMPLE = 2
+
+
+def write_png(filename, width, height, rgba):
+    """Escreve uma PNG RGBA de 8 bits"""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    stride = width * 4
+    raw = b''.join(b'\0' + rgba[y * stride:(y + 1) * stride] for y in range(height))
+
+    with open(filename, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw, 9)))
+        f.write(chunk(b'IEND', b''))
+
+
+def bounding_size(vertices):
+    """Maior dimensão do bounding box (como ScaleObject.calculateBoundingBox)"""
+    if not vertices:
+        return 1.0
+    return max(max(v[k] for v in vertices) - min(v[k] for v in vertices) for k in range(3))
+
+
+def view_transform(width, height):
+    """Devolve uma função que projeta um ponto do mundo para (x, y, profundidade) ou None"""
+    eye = (0.0, CAMERA_DISTANCE * CAMERA_HEIGHT, CAMERA_DISTANCE)
+
+    # lookAt(eye, origem, up=Y)
+    length = math.sqrt(sum(c * c for c in eye))
+    zx, zy, zz = (c / length for c in eye)
+    xx, xy, xz = zz, 0.0, -zx
+    length = math.sqrt(xx * xx + xz * xz)
+    xx, xz = xx / length, xz / length
+    yx, yy, yz = zy * xz - zz * xy, zz * xx - zx * xz, zx * xy - zy * xx
+
+    f = 1.0 / math.tan(FOV / 2)
+    aspect = width / height
+
+    def to_view(p):
+        px, py, pz = p[0] - eye[0], p[1] - eye[1], p[2] - eye[2]
+        return (xx * px + xy * py + xz * pz,
+                yx * px + yy * py + yz * pz,
+                zx * px + zy * py + zz * pz)
+
+    def to_screen(v):
+        depth = -v[2]
+        ndc_x = f / aspect * v[0] / depth
+        ndc_y = f * v[1] / depth
+        return (ndc_x + 1) * 0.5 * width, (1 - ndc_y) * 0.5 * height
+
+    return to_view, to_screen
+
+
+def clip_near(a, b):
+    """Recorta um segmento (espaço de vista) pelo plano near; None se invisível"""
+    da, db = -a[2] - NEAR, -b[2] - NEAR
+    if da < 0 and db < 0:
+        return None
+    if da < 0 or db < 0:
+        t = da / (da - db)
+        cut = tuple(a[k] + (b[k] - a[k]) * t for k in range(3))
+        return (cut, b) if da < 0 else (a, cut)
+    return a, b
+
+
+def clip_screen(x0, y0, x1, y1, width, height):
+    """Recorte Liang–Barsky ao retângulo do ecrã; None se fora"""
+    dx, dy = x1 - x0, y1 - y0
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x0), (dx, width - 1 - x0), (-dy, y0), (dy, height - 1 - y0)):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return None
+    return x0 + dx * t0, y0 + dy * t0, x0 + dx * t1, y0 + dy * t1
+
+
+def rasterize(geometry, scale, color, width, height, supersample):
+    """Desenha o wireframe e devolve os bytes RGBA (fundo transparente)"""
+    sw, sh = width * supersample, height * supersample
+    coverage = bytearray(sw * sh)
+    rgb = bytearray(sw * sh * 3)
+
+    to_view, to_screen = view_transform(sw, sh)
+    vertices = geometry['vertices']
+    colors = geometry['colors']
+    view = [to_view((v[0] * scale, v[1] * scale, v[2] * scale)) for v in vertices]
+    base = bytes(max(0, min(255, int(c * 255 + 0.5))) for c in color)
+
+    indices = geometry['indices']
+    for i in range(0, len(indices) - 1, 2):
+        a, b = indices[i], indices[i + 1]
+        if a >= len(view) or b >= len(view):
+            continue
+        segment = clip_near(view[a], view[b])
+        if segment is None:
+            continue
+        x0, y0 = to_screen(segment[0])
+        x1, y1 = to_screen(segment[1])
+        clipped = clip_screen(x0, y0, x1, y1, sw, sh)
+        if clipped is None:
+            continue
+        x0, y0, x1, y1 = clipped
+
+        if colors:
+            # Cor do segmento: média das cores dos extremos
+            seg_color = bytes(max(0, min(255, int((colors[a][k] + colors[b][k]) * 127.5 + 0.5))) for k in range(3))
+        else:
+            seg_color = base
+
+        steps = max(1, int(math.ceil(max(abs(x1 - x0), abs(y1 - y0)))))
+        sx, sy = (x1 - x0) / steps, (y1 - y0) / steps
+        x, y = x0, y0
+        for _ in range(steps + 1):
+            pixel = int(y + 0.5) * sw + int(x + 0.5)
+            coverage[pixel] = 1
+            rgb[pixel * 3:pixel * 3 + 3] = seg_color
+            x += sx
+            y += sy
+
+    # Reduz a amostragem: alfa = cobertura, cor = média das amostras cobertas
+    out = bytearray(width * height * 4)
+    samples = supersample * supersample
+    for y in range(height):
+        for x in range(width):
+            count = r = g = b = 0
+            for sy in range(y * supersample, (y + 1) * supersample):
+                row = sy * sw
+                for sx in range(x * supersample, (x + 1) * supersample):
+                    if coverage[row + sx]:
+                        p = (row + sx) * 3
+                        count += 1
+                        r += rgb[p]
+                        g += rgb[p + 1]
+                        b += rgb[p + 2]
+            if count:
+                o = (y * width + x) * 4
+                out[o:o + 4] = bytes((r // count, g // count, b // count, 255 * count // samples))
+
+    return bytes(out)
+
+
+def render_scale(job):
+    """Renderiza uma escala (executado num processo separado)"""
+    used, geometry = load_geometry_with_fallback(job['model'])
+    if geometry is None:
+        return dict(job, error='nenhum modelo disponível')
+
+    # Escala na grelha quando a escala está parada (AnimationController.getRenderInfo)
+    size = bounding_size(geometry['vertices']) or 1.0
+    scale = (job['objectSize'] / job['scale']) / size
+
+    rgba = rasterize(geometry, scale, job['color'], job['width'], job['height'], job['supersample'])
+    return dict(job, used=used, rgba=rgba)
+
+
+def build_jobs(config, width, height, supersample):
+    """Cria um trabalho por escala do config.json"""
+    jobs = []
+    for i, scale in enumerate(config.get('scales', [])):
+        jobs.append({
+            'index': i,
+            'name': scale.get('name', ''),
+            'model': scale.get('model', ''),
+            'scale': scale.get('scale', 1.0),
+            'objectSize': scale.get('objectSize') or scale.get('scale', 1.0),
+            'color': scale.get('color', [1.0, 1.0, 1.0]),
+            'width': width,
+            'height': height,
+            'supersample': supersample,
+        })
+    return jobs
+
+
+def write_atlas(output_dir, results, width, height):
+    """Junta todas as miniaturas num atlas PNG e grava o índice JSON"""
+    columns = max(1, math.ceil(math.sqrt(len(results))))
+    rows = max(1, math.ceil(len(results) / columns))
+    atlas_w, atlas_h = columns * width, rows * height
+    atlas = bytearray(atlas_w * atlas_h * 4)
+    tiles = []
+
+    for n, result in enumerate(results):
+        col, row = n % columns, n // columns
+        tile = {'index': result['index'], 'name': result['name'], 'model': result['model'],
+                'x': col * width, 'y': row * height, 'width': width, 'height': height}
+        tiles.append(tile)
+        if 'rgba' not in result:
+            continue
+        for y in range(height):
+            src = result['rgba'][y * width * 4:(y + 1) * width * 4]
+            dst = ((tile['y'] + y) * atlas_w + tile['x']) * 4
+            atlas[dst:dst + width * 4] = src
+
+    write_png(os.path.join(output_dir, 'atlas.png'), atlas_w, atlas_h, bytes(atlas))
+    with open(os.path.join(output_dir, 'atlas.json'), 'w', encoding='utf-8') as f:
+        json.dump({'image': 'atlas.png', 'width': atlas_w, 'height': atlas_h, 'tiles': tiles},
+                  f, indent=2, ensure_ascii=False)
+    print(f"✓ Atlas {atlas_w}x{atlas_h} salvo em: {os.path.join(output_dir, 'atlas.png')}")
+
+
+def write_thumbnails(output_dir, results, width, height):
+    """Grava uma PNG por escala e o índice thumbnails.json"""
+    entries = []
+    for result in results:
+        if 'rgba' not in result:
+            continue
+        name = f"{result['index']:02d}_{os.path.splitext(os.path.basename(result['model']))[0]}.png"
+        write_png(os.path.join(output_dir, name), width, height, result['rgba'])
+        entries.append({'index': result['index'], 'name': result['name'],
+                        'model': result['model'], 'image': name})
+
+    with open(os.path.join(output_dir, 'thumbnails.json'), 'w', encoding='utf-8') as f:
+        json.dump({'width': width, 'height': height, 'thumbnails': entries}, f, indent=2, ensure_ascii=False)
+    print(f"✓ {len(entries)} miniaturas salvas em: {output_dir}/")
+
+
+def main():
+    """Função principal"""
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Miniaturas Wireframe (CPU, sem GPU)          ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python render_thumbnails.py [opções]
+
+Opções:
+  --config <arquivo>     Configuração (padrão: config.json)
+  --output <pasta>       Pasta de saída (padrão: thumbnails)
+  --size <n>             Lado da miniatura em pixels (padrão: 128)
+  --supersample <n>      Amostras por pixel em cada eixo (padrão: 2)
+  --jobs <n>             Processos em paralelo (padrão: nº de CPUs)
+  --atlas                Grava um atlas único (atlas.png + atlas.json)
+
+Exemplos:
+  python render_thumbnails.py
+  python render_thumbnails.py --atlas --size 96
+        """)
+        return
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_file = os.path.abspath(option('--config', os.path.join(script_dir, 'config.json')))
+    output_dir = os.path.abspath(option('--output', os.path.join(script_dir, 'thumbnails')))
+    size = int(option('--size', DEFAULT_SIZE))
+    supersample = max(1, int(option('--supersample', DEFAULT_SUPERSAMPLE)))
+    workers = int(option('--jobs', os.cpu_count() or 1))
+
+    if not os.path.exists(config_file):
+        print(f"❌ Arquivo não encontrado: {config_file}")
+        return
+
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    # Os caminhos dos modelos são relativos à pasta do config.json (como no navegador)
+    os.chdir(os.path.dirname(config_file))
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = build_jobs(config, size, size, supersample)
+    print(f"🖼️  A renderizar {len(jobs)} escalas ({size}x{size}, {workers} processos)...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(render_scale, jobs))
+
+    for result in results:
+        if 'error' in result:
+            print(f"  ❌ {result['index']:2d}. {result['name']}: {result['error']}")
+        elif result['used'] != result['model']:
+            print(f"  ⚠️  {result['index']:2d}. {result['name']}: fallback {result['used']}")
+
+    if '--atlas' in sys.argv:
+        write_atlas(output_dir, results, size, size)
+    else:
+        write_thumbnails(output_dir, results, size, size)
+
+
+if __name__ == '__main__':
+    main()
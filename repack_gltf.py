@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Utilitário para emagrecer GLB/GLTF para Cosmic Scales
+
+O js/gltfloader.js só usa posições, cores (COLOR_0), índices, o modo da
+primitiva, a baseColorFactor dos materiais e a translação/escala dos nós.
+Este repacker reescreve o modelo como GLB mantendo apenas esses dados:
+- Remove NORMAL, TEXCOORD_*, TANGENT, JOINTS/WEIGHTS, texturas, imagens,
+  samplers, animações, skins, câmaras e bufferViews sem uso
+- Junta primitivas da mesma malha que partilham material e modo
+- Reescreve accessors (índices em Uint16 sempre que possível) e empacota o
+  chunk BIN com cada bufferView alinhado a 4 bytes
+- Valida o resultado com validate_models.validate_glb e compara a geometria
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+from model_io import (
+    MODE_LINES, MODE_POINTS, MODE_TRIANGLES, TARGET_ARRAY_BUFFER, TARGET_ELEMENT_ARRAY_BUFFER,
+    load_geometry, load_gltf, pad4, read_accessor, write_glb,
+)
+from validate_models import validate_glb
+
+# Modos de lista: concatenar primitivas não cria segmentos novos
+MERGEABLE_MODES = (MODE_POINTS, MODE_LINES, MODE_TRIANGLES)
+
+# Valor máximo de cada componentType inteiro (para accessors normalized)
+NORMALIZED_MAX = {5120: 127, 5121: 255, 5122: 32767, 5123: 65535}
+
+
+class BinWriter:
+    """Acumula accessors em dois bufferViews (vértices e índices) alinhados a 4 bytes"""
+
+    def __init__(self):
+        self.sections = {TARGET_ARRAY_BUFFER: bytearray(), TARGET_ELEMENT_ARRAY_BUFFER: bytearray()}
+        self.accessors = []
+
+    def add(self, values, fmt, component_type, accessor_type, target, with_bounds=False):
+        comps = len(values[0]) if values and isinstance(values[0], tuple) else 1
+        flat = [c for v in values for c in v] if comps > 1 else list(values)
+
+        section = self.sections[target]
+        section += b'\0' * (pad4(len(section)) - len(section))
+        accessor = {
+            'bufferView': target,  # Substituído pelo índice real em finish()
+            'byteOffset': len(section),
+            'componentType': component_type,
+            'count': len(values),
+            'type': accessor_type,
+        }
+        section += struct.pack(f'<{len(flat)}{fmt}', *flat)
+
+        if with_bounds and values:
+            accessor['min'] = [min(v[k] for v in values) for k in range(comps)]
+            accessor['max'] = [max(v[k] for v in values) for k in range(comps)]
+        self.accessors.append(accessor)
+        return len(self.accessors) - 1
+
+    def finish(self):
+        """Devolve (accessors, bufferViews, bin) com as secções não vazias"""
+        data = bytearray()
+        buffer_views = []
+        view_index = {}
+        for target, section in self.sections.items():
+            if not section:
+                continue
+            data += b'\0' * (pad4(len(data)) - len(data))
+            view_index[target] = len(buffer_views)
+            buffer_views.append({'buffer': 0, 'byteOffset': len(data), 'byteLength': len(section), 'target': target})
+            data += section
+
+        for accessor in self.accessors:
+            accessor['bufferView'] = view_index[accessor['bufferView']]
+        return self.accessors, buffer_views, bytes(data)
+
+    def add_positions(self, positions):
+        return self.add(positions, 'f', 5126, 'VEC3', TARGET_ARRAY_BUFFER, with_bounds=True)
+
+    def add_colors(self, colors):
+        return self.add(colors, 'f', 5126, 'VEC3', TARGET_ARRAY_BUFFER)
+
+    def add_indices(self, indices):
+        if indices and max(indices) > 65535:
+            return self.add(indices, 'I', 5125, 'SCALAR', TARGET_ELEMENT_ARRAY_BUFFER)
+        return self.add(indices, 'H', 5123, 'SCALAR', TARGET_ELEMENT_ARRAY_BUFFER)
+
+
+def read_colors(gltf, buffers, accessor_index):
+    """Lê COLOR_0 como RGB em float (converte accessors normalized e descarta alfa)"""
+    accessor = gltf['accessors'][accessor_index]
+    scale = NORMALIZED_MAX.get(accessor['componentType']) if accessor.get('normalized') else None
+    colors = []
+    for c in read_accessor(gltf, buffers, accessor_index):
+        rgb = c[:3]
+        if scale:
+            rgb = tuple(x / scale for x in rgb)
+        colors.append(tuple(float(x) for x in rgb))
+    return colors
+
+
+def read_primitive(gltf, buffers, prim):
+    """Lê os dados de uma primitiva que o visualizador usa"""
+    attributes = prim.get('attributes', {})
+    positions = [tuple(p) for p in read_accessor(gltf, buffers, attributes['POSITION'])] if 'POSITION' in attributes else []
+    colors = read_colors(gltf, buffers, attributes['COLOR_0']) if 'COLOR_0' in attributes else None
+    if 'indices' in prim:
+        indices = [i[0] for i in read_accessor(gltf, buffers, prim['indices'])]
+    else:
+        indices = list(range(len(positions)))
+    return positions, colors, indices
+
+
+def merge_key(prim):
+    """Primitivas com a mesma chave podem ser juntadas numa só"""
+    return (prim.get('material'), prim.get('mode', MODE_TRIANGLES), 'COLOR_0' in prim.get('attributes', {}))
+
+
+def repack(gltf, buffers):
+    """Constrói o GLTF emagrecido e o conteúdo do chunk BIN"""
+    if gltf.get('extensionsRequired'):
+        raise ValueError(f"Extensões obrigatórias não suportadas: {', '.join(gltf['extensionsRequired'])}")
+    for accessor in gltf.get('accessors', []):
+        if 'sparse' in accessor:
+            raise ValueError("Accessors sparse não são suportados")
+
+    out = BinWriter()
+    materials = {}
+    meshes = []
+    merged_count = 0
+
+    def material_index(old):
+        # Apenas a cor base é usada pelo visualizador
+        if old is None:
+            return None
+        if old not in materials:
+            pbr = gltf['materials'][old].get('pbrMetallicRoughness', {})
+            material = {'pbrMetallicRoughness': {'baseColorFactor': pbr.get('baseColorFactor', [1, 1, 1, 1])}}
+            if 'name' in gltf['materials'][old]:
+                material['name'] = gltf['materials'][old]['name']
+            materials[old] = (len(materials), material)
+        return materials[old][0]
+
+    # Reutiliza accessors partilhados entre malhas (ex.: o mesmo buffer de índices)
+    reused = {}
+
+    def reuse(key, build):
+        if key not in reused:
+            reused[key] = build()
+        return reused[key]
+
+    for mesh in gltf.get('meshes', []):
+        # Só primitivas consecutivas com a mesma chave são juntadas: o carregador
+        # concatena os índices por ordem e desenha-os como pares gl.LINES, por isso
+        # juntar primitivas afastadas mudaria os pares (listas de comprimento ímpar)
+        runs = []
+        for prim in mesh.get('primitives', []):
+            if 'POSITION' not in prim.get('attributes', {}):
+                continue
+            key = merge_key(prim)
+            if runs and runs[-1][0] == key:
+                runs[-1][1].append(prim)
+            else:
+                runs.append((key, [prim]))
+
+        primitives = []
+        for (material, mode, has_colors), prims in runs:
+            if len(prims) == 1 or mode not in MERGEABLE_MODES:
+                # Strips e loops não podem ser concatenados: cada primitiva fica
+                # com os seus índices, reutilizando os vértices partilhados
+                batches = [[prim] for prim in prims]
+            else:
+                batches = [prims]
+                merged_count += len(prims) - 1
+
+            for batch in batches:
+                new_prim = {'attributes': {}, 'mode': mode}
+                if len(batch) == 1:
+                    prim = batch[0]
+                    attributes = prim['attributes']
+                    positions, colors, indices = read_primitive(gltf, buffers, prim)
+                    new_prim['attributes']['POSITION'] = reuse(('POSITION', attributes['POSITION']),
+                                                               lambda: out.add_positions(positions))
+                    if has_colors:
+                        new_prim['attributes']['COLOR_0'] = reuse(('COLOR_0', attributes['COLOR_0']),
+                                                                  lambda: out.add_colors(colors))
+                    index_key = ('indices', prim['indices']) if 'indices' in prim else ('range', len(positions))
+                    new_prim['indices'] = reuse(index_key, lambda: out.add_indices(indices))
+                    if 'extras' in prim:
+                        new_prim['extras'] = prim['extras']
+                else:
+                    all_positions, all_colors, all_indices = [], [], []
+                    offsets = {}
+                    for prim in batch:
+                        attributes = prim['attributes']
+                        positions, colors, indices = read_primitive(gltf, buffers, prim)
+                        # Vértices partilhados entre as primitivas juntadas entram uma só vez
+                        vertex_key = (attributes['POSITION'], attributes.get('COLOR_0'))
+                        if vertex_key not in offsets:
+                            offsets[vertex_key] = len(all_positions)
+                            all_positions.extend(positions)
+                            if has_colors:
+                                all_colors.extend(colors)
+                        all_indices.extend(i + offsets[vertex_key] for i in indices)
+                    new_prim['attributes']['POSITION'] = out.add_positions(all_positions)
+                    if has_colors:
+                        new_prim['attributes']['COLOR_0'] = out.add_colors(all_colors)
+                    new_prim['indices'] = out.add_indices(all_indices)
+
+                if material is not None:
+                    new_prim['material'] = material_index(material)
+                primitives.append(new_prim)
+
+        new_mesh = {'primitives': primitives}
+        if 'name' in mesh:
+            new_mesh['name'] = mesh['name']
+        meshes.append(new_mesh)
+
+    nodes = []
+    for node in gltf.get('nodes', []):
+        new_node = {k: node[k] for k in ('name', 'mesh', 'translation', 'rotation', 'scale', 'children') if k in node}
+        nodes.append(new_node)
+
+    slim = {'asset': {'version': '2.0', 'generator': 'Cosmic Scales repack_gltf.py'}}
+    if 'scene' in gltf:
+        slim['scene'] = gltf['scene']
+    if 'scenes' in gltf:
+        slim['scenes'] = [{k: s[k] for k in ('name', 'nodes') if k in s} for s in gltf['scenes']]
+    if nodes:
+        slim['nodes'] = nodes
+    slim['meshes'] = meshes
+    if materials:
+        slim['materials'] = [m for _, m in sorted(materials.values(), key=lambda e: e[0])]
+    slim['accessors'], slim['bufferViews'], bin_data = out.finish()
+    slim['buffers'] = [{'byteLength': pad4(len(bin_data))}]
+
+    return slim, bin_data, merged_count
+
+
+def segment_set(geometry):
+    """Conjunto de segmentos (coordenadas arredondadas) para comparar geometrias"""
+    vertices = geometry['vertices']
+    indices = geometry['indices']
+    segments = set()
+    for i in range(0, len(indices) - 1, 2):
+        a = tuple(round(c, 5) for c in vertices[indices[i]])
+        b = tuple(round(c, 5) for c in vertices[indices[i + 1]])
+        segments.add((a, b) if a <= b else (b, a))
+    return segments
+
+
+def repack_file(input_file, output_file):
+    """Emagrece um modelo, valida o resultado e mostra os bytes poupados"""
+    print(f"\n🔧 Repack: {input_file}")
+    print("=" * 60)
+
+    gltf, buffers = load_gltf(input_file)
+    slim, bin_data, merged = repack(gltf, buffers)
+
+    # Grava num temporário ao lado do destino; só substitui o destino depois
+    # de validar, para não deixar um _slim.glb inválido ao lado do original
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(output_file)),
+                                     suffix='.glb', delete=False) as tmp:
+        tmp_name = tmp.name
+    try:
+        if not check_repacked(input_file, gltf, slim, bin_data, merged, tmp_name):
+            return False
+        # Permissões de um ficheiro criado normalmente (mkstemp usa 0600)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_name, 0o666 & ~umask)
+        os.replace(tmp_name, output_file)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+    print(f"✓ Arquivo salvo em: {output_file}")
+    return True
+
+
+def check_repacked(input_file, gltf, slim, bin_data, merged, output_file):
+    """Grava o resultado, valida-o e compara a geometria com a original"""
+    size = write_glb(output_file, slim, bin_data)
+
+    before = os.path.getsize(input_file)
+    if os.path.splitext(input_file)[1].lower() == '.gltf':
+        model_dir = os.path.dirname(input_file)
+        for buffer in gltf.get('buffers', []):
+            uri = buffer.get('uri', '')
+            if uri and not uri.startswith('data:'):
+                before += os.path.getsize(os.path.join(model_dir, uri))
+
+    print(f"✓ Accessors: {len(gltf.get('accessors', []))} → {len(slim['accessors'])}")
+    print(f"✓ BufferViews: {len(gltf.get('bufferViews', []))} → {len(slim['bufferViews'])}")
+    print(f"✓ Primitivas juntadas: {merged}")
+
+    if not validate_glb(output_file):
+        print(f"❌ Resultado inválido para {input_file}")
+        return False
+
+    original = load_geometry(input_file)
+    result = load_geometry(output_file)
+    if segment_set(original) != segment_set(result) or bool(original['colors']) != bool(result['colors']):
+        print("  ❌ ERRO: A geometria do resultado difere do original")
+        return False
+    print("  ✓ Geometria idêntica à original")
+
+    saved = before - size
+    print(f"\n💾 {before} → {size} bytes ({saved} bytes poupados, {saved / before * 100:.1f}%)")
+    return True
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Emagrecimento de GLB/GLTF                     ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python repack_gltf.py <modelo.glb|modelo.gltf> [--output <arquivo.glb>]
+
+Por omissão grava <modelo>_slim.glb ao lado do original.
+
+Exemplos:
+  python repack_gltf.py models/hydrogen_no_bg.glb
+  python repack_gltf.py models/hydrogen_no_bg.glb --output models/hydrogen.glb
+        """)
+        return 0
+
+    input_file = sys.argv[1]
+    if not os.path.exists(input_file):
+        print(f"❌ Arquivo não encontrado: {input_file}")
+        return 1
+
+    output_file = f"{os.path.splitext(input_file)[0]}_slim.glb"
+    if '--output' in sys.argv:
+        output_idx = sys.argv.index('--output')
+        if output_idx + 1 < len(sys.argv):
+            output_file = sys.argv[output_idx + 1]
+
+    try:
+        ok = repack_file(input_file, output_file)
+    except Exception as e:
+        print(f"❌ Erro ao processar {input_file}: {e}")
+        return 1
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
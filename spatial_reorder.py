@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Reordenação espacial de vértices (curva de Morton ou Hilbert) para modelos OBJ
+
+A ordem dos vértices nos nossos OBJ vem da ferramenta que os gerou, por isso
+gzip/brotli encontram pouca redundância e a leitura de vértices na GPU tem
+pouca localidade. Este utilitário ordena os vértices ao longo de uma curva
+de Hilbert (ou Morton) 3D sobre o cubo do modelo (-1..1 nos modelos
+normalizados), remapeia os índices das faces, linhas e do <modelo>_colors.json,
+e ordena os segmentos pelo seu primeiro vértice. Mostra a variação do tamanho
+comprimido de cada modelo.
+"""
+
+import gzip
+import json
+import os
+import sys
+
+from model_io import (
+    colors_path, find_model_files, hilbert_code, morton_code, option, quantize, reorder_colors,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CURVES = {'hilbert': hilbert_code, 'morton': morton_code}
+CURVE_BITS = 10
+
+
+def parse_index(token, num_vertices):
+    """Índice de vértice (base 0) do primeiro componente de 'v/vt/vn'"""
+    idx = int(token.split('/')[0])
+    if idx < 0:
+        raise ValueError("Índices relativos (negativos) não são suportados")
+    if not 1 <= idx <= num_vertices:
+        raise ValueError(f"Índice {idx} fora do intervalo (1..{num_vertices})")
+    return idx - 1
+
+
+def reorder_obj(text, curve='hilbert'):
+    """Reordena o texto de um OBJ; devolve (novo texto, remapeamento antigo → novo)"""
+    lines = text.splitlines(keepends=True)
+
+    def ending_of(line):
+        return line[len(line.rstrip('\r\n')):]
+
+    # Registos movidos mantêm o fim de linha do ficheiro (LF ou CRLF); a última
+    # linha, se não tiver fim de linha, recebe o do resto do ficheiro
+    newline = next((ending_of(line) for line in lines if ending_of(line)), '\n')
+
+    vertex_lines = []
+    vertices = []
+    for line in lines:
+        parts = line.split()
+        if parts and parts[0] == 'v':
+            vertex_lines.append(line if ending_of(line) else line + newline)
+            vertices.append((float(parts[1]), float(parts[2]), float(parts[3])))
+
+    if not vertices:
+        return text, []
+
+    bounds_min = [min(v[k] for v in vertices) for k in range(3)]
+    extent = max(max(v[k] for v in vertices) - bounds_min[k] for k in range(3))
+    code = CURVES[curve]
+    keys = [code(*quantize(v, bounds_min, extent, CURVE_BITS), bits=CURVE_BITS) for v in vertices]
+    order = sorted(range(len(vertices)), key=lambda v: (keys[v], v))
+    remap = [0] * len(vertices)
+    for new, old in enumerate(order):
+        remap[old] = new
+
+    def rewrite(line):
+        # Remapeia só o índice de posição, mantendo vt/vn
+        parts = line.split()
+        tokens = []
+        for token in parts[1:]:
+            fields = token.split('/')
+            fields[0] = str(remap[parse_index(token, len(vertices))] + 1)
+            tokens.append('/'.join(fields))
+
+        first = [int(t.split('/')[0]) for t in tokens]
+        if parts[0] == 'l':
+            # Uma polilinha é igual nos dois sentidos: começa pelo menor extremo
+            if first[-1] < first[0]:
+                tokens.reverse()
+                first.reverse()
+        else:
+            # Rodar uma face mantém o sentido: começa pelo menor índice
+            start = first.index(min(first))
+            tokens = tokens[start:] + tokens[:start]
+            first = first[start:] + first[:start]
+        return first[0], f"{parts[0]} {' '.join(tokens)}{ending_of(line) or newline}"
+
+    out = []
+    block = []
+    vertices_written = False
+
+    def flush():
+        # Segmentos ordenados pelo primeiro vértice dentro de cada bloco (grupo/material)
+        block.sort(key=lambda entry: entry[0])
+        out.extend(entry[1] for entry in block)
+        block.clear()
+
+    for line in lines:
+        parts = line.split()
+        if parts and parts[0] == 'v':
+            if not vertices_written:
+                flush()
+                out.extend(vertex_lines[old] for old in order)
+                vertices_written = True
+        elif parts and parts[0] in ('f', 'l'):
+            block.append(rewrite(line))
+        else:
+            flush()
+            out.append(line)
+    flush()
+
+    return ''.join(out), remap
+
+
+def compressed_sizes(data):
+    """Tamanhos gzip e brotli (se disponível) de um conteúdo"""
+    sizes = {'raw': len(data), 'gzip': len(gzip.compress(data, 9))}
+    if brotli is not None:
+        sizes['br'] = len(brotli.compress(data, quality=11))
+    return sizes
+
+
+def process_model(filename, curve='hilbert', output_file=None):
+    """Reordena um modelo (e as suas cores) e devolve os tamanhos antes/depois"""
+    with open(filename, 'r', newline='') as f:
+        text = f.read()
+    new_text, remap = reorder_obj(text, curve)
+
+    before = text.encode('utf-8')
+    after = new_text.encode('utf-8')
+
+    colors_file = colors_path(filename)
+    new_colors_text = None
+    if os.path.exists(colors_file) and remap:
+        with open(colors_file, 'r', encoding='utf-8') as f:
+            colors_text = f.read()
+        new_colors_text = json.dumps(reorder_colors(json.loads(colors_text), remap))
+        before += colors_text.encode('utf-8')
+        after += new_colors_text.encode('utf-8')
+
+    if output_file:
+        with open(output_file, 'w', newline='') as f:
+            f.write(new_text)
+        print(f"✓ Modelo reordenado salvo em: {output_file}")
+        if new_colors_text is not None:
+            with open(colors_path(output_file), 'w', encoding='utf-8') as f:
+                f.write(new_colors_text)
+            print(f"✓ Cores remapeadas salvas em: {colors_path(output_file)}")
+
+    return compressed_sizes(before), compressed_sizes(after)
+
+
+def print_sizes(filename, before, after):
+    """Mostra a variação do tamanho comprimido"""
+    print(f"\n📊 {filename}")
+    for kind in before:
+        delta = after[kind] - before[kind]
+        pct = delta / before[kind] * 100 if before[kind] else 0.0
+        print(f"  {kind:5s}: {before[kind]:8d} → {after[kind]:8d} bytes ({pct:+.1f}%)")
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - Reordenação Espacial de Vértices (OBJ)       ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python spatial_reorder.py <modelo.obj> [opções]
+  python spatial_reorder.py --all [--curve morton]
+
+Opções:
+  --curve <hilbert|morton>  Curva de ordenação (padrão: hilbert)
+  --output <arquivo>        Grava o modelo (e <arquivo>_colors.json, se houver)
+                            Padrão: <modelo>_reordered.obj
+  --all                     Apenas relatório para todos os OBJ em models/
+
+Exemplos:
+  python spatial_reorder.py models/ball.obj --output models/ball_sorted.obj
+  python spatial_reorder.py --all --curve morton
+        """)
+        return 0
+
+    curve = option('--curve', 'hilbert')
+    if curve not in CURVES:
+        print(f"❌ Curva desconhecida: {curve} (use hilbert ou morton)")
+        return 1
+
+    if sys.argv[1] == '--all':
+        # Como em validate_models.py: models/ é relativo à pasta do script
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        files = [f for f in find_model_files('models') if f.lower().endswith('.obj')]
+        output_file = None
+    else:
+        files = [sys.argv[1]]
+        output_file = option('--output', f"{os.path.splitext(sys.argv[1])[0]}_reordered.obj")
+
+    if brotli is None:
+        print("ℹ️  Módulo 'brotli' não instalado: apenas tamanhos gzip")
+
+    totals = [0, 0]
+    failed = 0
+    for filename in files:
+        if not os.path.exists(filename):
+            print(f"❌ Arquivo não encontrado: {filename}")
+            failed += 1
+            continue
+        try:
+            before, after = process_model(filename, curve, output_file)
+        except Exception as e:
+            print(f"❌ Erro ao processar {filename}: {e}")
+            failed += 1
+            continue
+        print_sizes(filename, before, after)
+        totals[0] += before['gzip']
+        totals[1] += after['gzip']
+
+    if len(files) > 1 and totals[0]:
+        print(f"\n✓ Total gzip: {totals[0]} → {totals[1]} bytes "
+              f"({(totals[1] - totals[0]) / totals[0] * 100:+.1f}%)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Utilitário para unir as arestas de um modelo em polilinhas contínuas (line strips)
+
+O ScaleObject desenha tudo com gl.LINES (dois índices por segmento). Para
+geometria em anel, como a das esferas e árvores de generate_placeholders.py,
+quase metade desses índices é repetida. Esta ferramenta extrai o grafo de
+arestas únicas, percorre-o com um caminho de Euler guloso (com junção de
+ciclos, à Hierholzer) e emite o menor número possível de polilinhas:
+- OBJ: registos 'l' com muitos vértices (aceites por OBJLoader.parse)
+- GLB: primitivas LINE_STRIP (mode 3)
+As cores por vértice são mantidas (COLOR_0 no GLB, <modelo>_colors.json no OBJ).
+"""
+
+import json
+import os
+import shutil
+import struct
+import sys
+
+from model_io import (
+    MODE_LINE_STRIP, TARGET_ARRAY_BUFFER, TARGET_ELEMENT_ARRAY_BUFFER,
+    colors_path, find_model_files, load_geometry, option, pad4, write_glb,
+)
+
+
+def unique_edges(indices):
+    """Devolve as arestas únicas (não orientadas) de uma lista de pares gl.LINES"""
+    edges = set()
+    for i in range(0, len(indices) - 1, 2):
+        a, b = indices[i], indices[i + 1]
+        if a == b:
+            continue  # Segmento degenerado
+        edges.add((a, b) if a < b else (b, a))
+    return sorted(edges)
+
+
+def stitch_edges(edges):
+    """Agrupa arestas em polilinhas (listas de índices) usando um caminho de Euler guloso"""
+    adjacency = {}
+    for a, b in edges:
+        adjacency.setdefault(a, []).append(b)
+        adjacency.setdefault(b, []).append(a)
+    for neighbours in adjacency.values():
+        neighbours.sort(reverse=True)  # pop() devolve o vizinho de menor índice
+
+    used = set()
+
+    def remaining(v):
+        # Descarta arestas já percorridas a partir do outro extremo
+        neighbours = adjacency[v]
+        while neighbours and ((v, neighbours[-1]) if v < neighbours[-1] else (neighbours[-1], v)) in used:
+            neighbours.pop()
+        return neighbours
+
+    def walk(start):
+        # Segue arestas livres até ficar preso
+        path = [start]
+        v = start
+        while remaining(v):
+            w = adjacency[v].pop()
+            used.add((v, w) if v < w else (w, v))
+            path.append(w)
+            v = w
+        return path
+
+    def degree(v):
+        return sum(1 for w in adjacency[v] if ((v, w) if v < w else (w, v)) not in used)
+
+    # 1) Caminhos entre vértices de grau ímpar: cada um emparelha dois extremos
+    polylines = []
+    for v in sorted(adjacency):
+        while degree(v) % 2 == 1:
+            polylines.append(walk(v))
+
+    # 2) O que sobra tem grau par em todos os vértices: só ciclos.
+    #    Sempre que possível, o ciclo é inserido numa polilinha que já passa pelo vértice.
+    members = {}
+    for p, path in enumerate(polylines):
+        for v in path:
+            members.setdefault(v, p)
+
+    def splice(p, v, cycle):
+        path = polylines[p]
+        pos = path.index(v)
+        polylines[p] = path[:pos] + cycle + path[pos + 1:]
+
+    def attach(p, path):
+        for w in path:
+            members.setdefault(w, p)
+            if remaining(w):
+                attached.append(w)
+
+    attached = [v for v in members if remaining(v)]
+    while True:
+        while attached:
+            v = attached.pop()
+            if remaining(v):
+                cycle = walk(v)
+                splice(members[v], v, cycle)
+                attach(members[v], cycle)
+
+        # Componente ainda sem polilinha: começa uma nova
+        start = next((v for v in sorted(adjacency) if remaining(v)), None)
+        if start is None:
+            break
+        polylines.append(walk(start))
+        attach(len(polylines) - 1, polylines[-1])
+
+    return polylines
+
+
+def write_obj_strips(filename, vertices, polylines):
+    """Escreve um OBJ com uma linha 'l' por polilinha"""
+    with open(filename, 'w') as f:
+        f.write("# Line strips by Cosmic Scales utility\n\n")
+
+        f.write("# Vertices\n")
+        for v in vertices:
+            f.write(f"v {v[0]:.6f} {v[1]:.6f} {v[2]:.6f}\n")
+
+        f.write("\n# Lines\n")
+        for path in polylines:
+            f.write("l " + ' '.join(str(i + 1) for i in path) + "\n")
+
+
+def write_obj_colors(input_file, output_file, colors):
+    """Cores do OBJ de saída: copia o _colors.json do original ou exporta as cores do GLB
+
+    A ordem dos vértices não muda, por isso os índices continuam válidos.
+    """
+    source = colors_path(input_file)
+    target = colors_path(output_file)
+    if os.path.exists(source):
+        if os.path.abspath(source) != os.path.abspath(target):
+            shutil.copyfile(source, target)
+    elif colors:
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump({str(i + 1): list(c[:3]) for i, c in enumerate(colors)}, f)
+    else:
+        return None
+    return target
+
+
+def write_glb_strips(filename, vertices, polylines, colors=None):
+    """Escreve um GLB com uma primitiva LINE_STRIP por polilinha"""
+    positions = b''.join(struct.pack('<3f', *v) for v in vertices)
+    attributes = {'POSITION': 0}
+    index_format = 'H' if len(vertices) <= 65535 else 'I'
+    component_type = 5123 if index_format == 'H' else 5125
+
+    accessors = [{
+        'bufferView': 0,
+        'componentType': 5126,
+        'count': len(vertices),
+        'type': 'VEC3',
+        'min': [min(v[k] for v in vertices) for k in range(3)],
+        'max': [max(v[k] for v in vertices) for k in range(3)],
+    }]
+
+    # COLOR_0 fica no mesmo bufferView de vértices, logo a seguir às posições
+    if colors:
+        accessors.append({
+            'bufferView': 0,
+            'byteOffset': len(positions),
+            'componentType': 5126,
+            'count': len(colors),
+            'type': 'VEC3',
+        })
+        attributes['COLOR_0'] = 1
+        positions += b''.join(struct.pack('<3f', *c[:3]) for c in colors)
+
+    buffer_views = [{
+        'buffer': 0,
+        'byteOffset': 0,
+        'byteLength': len(positions),
+        'target': TARGET_ARRAY_BUFFER,
+    }]
+
+    index_data = b''
+    primitives = []
+    for path in polylines:
+        accessors.append({
+            'bufferView': 1,
+            'byteOffset': len(index_data),
+            'componentType': component_type,
+            'count': len(path),
+            'type': 'SCALAR',
+        })
+        primitives.append({
+            'attributes': dict(attributes),
+            'indices': len(accessors) - 1,
+            'mode': MODE_LINE_STRIP,
+        })
+        index_data += struct.pack(f'<{len(path)}{index_format}', *path)
+        # Cada accessor começa alinhado a 4 bytes
+        index_data += b'\0' * (pad4(len(index_data)) - len(index_data))
+
+    buffer_views.append({
+        'buffer': 0,
+        'byteOffset': len(positions),
+        'byteLength': len(index_data),
+        'target': TARGET_ELEMENT_ARRAY_BUFFER,
+    })
+
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'Cosmic Scales stitch_lines.py'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0}],
+        'meshes': [{'primitives': primitives}],
+        'accessors': accessors,
+        'bufferViews': buffer_views,
+        'buffers': [{'byteLength': pad4(len(positions) + len(index_data))}],
+    }
+
+    return write_glb(filename, gltf, positions + index_data)
+
+
+def stitch_model(filename, output_file=None):
+    """Une as arestas de um modelo, opcionalmente grava o resultado, e devolve as estatísticas"""
+    geometry = load_geometry(filename)
+    vertices = geometry['vertices']
+    edges = unique_edges(geometry['indices'])
+    polylines = stitch_edges(edges)
+
+    stats = {
+        'file': filename,
+        'vertices': len(vertices),
+        'line_indices': len(geometry['indices']),
+        'unique_edges': len(edges),
+        'strips': len(polylines),
+        'strip_indices': sum(len(p) for p in polylines),
+    }
+
+    if output_file:
+        fmt = os.path.splitext(output_file)[1].lower().lstrip(".")
+        if fmt == 'glb':
+            write_glb_strips(output_file, vertices, polylines, geometry['colors'])
+        else:
+            write_obj_strips(output_file, vertices, polylines)
+            colors_file = write_obj_colors(filename, output_file, geometry['colors'])
+            if colors_file:
+                print(f"✓ Cores salvas em: {colors_file}")
+        print(f"✓ Polilinhas salvas em: {output_file}")
+
+    return stats
+
+
+def print_stats(stats):
+    """Mostra a poupança de índices de um modelo"""
+    before = stats['line_indices']
+    after = stats['strip_indices']
+    saving = (1 - after / before) * 100 if before else 0.0
+
+    print(f"\n📊 {stats['file']}")
+    print(f"  Vértices: {stats['vertices']}")
+    print(f"  Arestas únicas: {stats['unique_edges']} (de {before // 2} segmentos)")
+    print(f"  Polilinhas: {stats['strips']}")
+    print(f"  Índices: {before} (LINES) → {after} (strips)  💾 {saving:.1f}% poupado")
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("""
+╔════════════════════════════════════════════════════════════════╗
+║  Cosmic Scales - União de Arestas em Polilinhas               ║
+╚════════════════════════════════════════════════════════════════╝
+
+Uso:
+  python stitch_lines.py <modelo> [opções]
+  python stitch_lines.py --all
+
+Opções:
+  --output <arquivo>   Grava as polilinhas (.obj → registos 'l', .glb → LINE_STRIP)
+  --all                Apenas relatório para todos os modelos em models/
+
+Exemplos:
+  python stitch_lines.py models/sun.obj
+  python stitch_lines.py models/sun.obj --output models/sun_strips.obj
+  python stitch_lines.py models/tree.obj --output models/tree_strips.glb
+        """)
+        return
+
+    if sys.argv[1] == '--all':
+        # Como em validate_models.py: models/ é relativo à pasta do script
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        model_files = find_model_files('models')
+    else:
+        model_files = [sys.argv[1]]
+
+    output_file = option('--output')
+
+    total_before = 0
+    total_after = 0
+    for filename in model_files:
+        if not os.path.exists(filename):
+            print(f"❌ Arquivo não encontrado: {filename}")
+            continue
+        try:
+            stats = stitch_model(filename, output_file if len(model_files) == 1 else None)
+        except Exception as e:
+            print(f"❌ Erro ao processar {filename}: {e}")
+            continue
+        print_stats(stats)
+        total_before += stats['line_indices']
+        total_after += stats['strip_indices']
+
+    if len(model_files) > 1 and total_before:
+        print(f"\n✓ Total: {total_before} → {total_after} índices "
+              f"({(1 - total_after / total_before) * 100:.1f}% poupado)")
+
+
+if __name__ == '__main__':
+    main()
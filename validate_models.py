@@ -7,7 +7,9 @@ import sys
 import os
 import json
 import struct
-import glob
+import time
+
+from model_io import find_model_files, option
 
 def validate_obj(filename):
     """Valida um arquivo OBJ usando a lógica existente"""
@@ -330,6 +332,138 @@ def validate_model(filename):
         print(f"❌ Formato não suportado: {ext}")
         return False
 
+def select_shard(model_files, shard_index, shard_count):
+    """Arquivos do shard (base 1), equilibrando os shards pelo tamanho em bytes
+
+    Atribuição gulosa determinística: do maior para o menor arquivo (empate pelo
+    nome), cada um vai para o shard com menos bytes (empate pelo menor índice).
+    """
+    sizes = {f: os.path.getsize(f) for f in model_files}
+    totals = [0] * shard_count
+    shards = [[] for _ in range(shard_count)]
+
+    for filename in sorted(model_files, key=lambda f: (-sizes[f], f)):
+        target = min(range(shard_count), key=lambda k: (totals[k], k))
+        totals[target] += sizes[filename]
+        shards[target].append(filename)
+
+    return sorted(shards[shard_index - 1])
+
+def parse_shard(value):
+    """Converte 'i/N' em (i, N), com 1 <= i <= N"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Formato de shard inválido: {value} (use i/N, ex.: 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard fora do intervalo: {value} (1 <= i <= N)")
+    return index, count
+
+def print_summary(valid_count, invalid_count, total, invalid_files):
+    """Resumo final da validação"""
+    print(f"""
+╔════════════════════════════════════════════════════════════════╗
+║  RESULTADO DA VALIDAÇÃO                                       ║
+╚════════════════════════════════════════════════════════════════╝
+
+✓ Modelos válidos: {valid_count}
+❌ Modelos inválidos: {invalid_count}
+
+Total: {total} modelos analisados
+    """)
+
+    if invalid_files:
+        print("""
+⚠️  ARQUIVOS INVÁLIDOS ENCONTRADOS:""")
+        for f in invalid_files:
+            print(f"  ❌ {f}")
+        print("""
+💡 RECOMENDAÇÕES:
+   - Para GLTF com buffers externos faltantes: converta para GLB ou obtenha os arquivos .bin
+   - Para modelos corrompidos: substitua por versões válidas
+   - Verifique viewers online como https://gltf-viewer.donmccurdy.com/ para testar modelos
+        """)
+
+def run_shard(shard_index, shard_count, report_file):
+    """Valida um shard e grava o relatório NDJSON (uma linha JSON por registo)"""
+    model_files = find_model_files()
+    shard_files = select_shard(model_files, shard_index, shard_count)
+    shard_bytes = sum(os.path.getsize(f) for f in shard_files)
+
+    print(f"📁 Shard {shard_index}/{shard_count}: {len(shard_files)} de {len(model_files)} "
+          f"arquivos ({shard_bytes} bytes)")
+    for f in shard_files:
+        print(f"  - {f}")
+
+    with open(report_file, 'w', encoding='utf-8') as report:
+        # Primeira linha: cabeçalho para o --merge confirmar que todos os shards chegaram
+        header = {'shard': shard_index, 'shards': shard_count, 'discovered': len(model_files),
+                  'files': len(shard_files), 'bytes': shard_bytes}
+        report.write(json.dumps(header) + '\n')
+
+        for filename in shard_files:
+            started = time.perf_counter()
+            valid = validate_model(filename)
+            record = {
+                'file': filename,
+                'valid': valid,
+                'format': os.path.splitext(filename)[1].lower().lstrip('.'),
+                'bytes': os.path.getsize(filename),
+                'seconds': round(time.perf_counter() - started, 4),
+            }
+            report.write(json.dumps(record) + '\n')
+
+    print(f"\n✓ Relatório do shard salvo em: {report_file}")
+    return 0
+
+def merge_reports(report_files):
+    """Junta os relatórios NDJSON dos shards e imprime o resumo final"""
+    headers = {}
+    records = {}
+
+    for report_file in report_files:
+        with open(report_file, 'r', encoding='utf-8') as report:
+            for line in report:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if 'shard' in entry:
+                    headers[entry['shard']] = entry
+                else:
+                    records[entry['file']] = entry
+
+    if not headers:
+        print("❌ Nenhum cabeçalho de shard encontrado nos relatórios")
+        return 1
+
+    shard_counts = {h['shards'] for h in headers.values()}
+    discovered = {h['discovered'] for h in headers.values()}
+    if len(shard_counts) != 1 or len(discovered) != 1:
+        print("❌ Relatórios de execuções diferentes (número de shards ou de arquivos diverge)")
+        return 1
+
+    shard_count = shard_counts.pop()
+    missing = [k for k in range(1, shard_count + 1) if k not in headers]
+    if missing:
+        print(f"❌ Faltam relatórios dos shards: {', '.join(f'{k}/{shard_count}' for k in missing)}")
+        return 1
+
+    total = discovered.pop()
+    if len(records) != total:
+        print(f"❌ Relatórios cobrem {len(records)} de {total} arquivos")
+        return 1
+
+    print(f"📁 {len(report_files)} relatórios, {shard_count} shards, {total} arquivos")
+    for header in sorted(headers.values(), key=lambda h: h['shard']):
+        print(f"  - Shard {header['shard']}/{shard_count}: {header['files']} arquivos, {header['bytes']} bytes")
+
+    ordered = [records[f] for f in sorted(records)]
+    print(f"⏱️  Tempo total de validação: {sum(r['seconds'] for r in ordered):.2f}s")
+    invalid_files = [r['file'] for r in ordered if not r['valid']]
+    print_summary(len(ordered) - len(invalid_files), len(invalid_files), total, invalid_files)
+    return 0
+
 def main():
     """Função principal"""
     print("""
@@ -338,17 +472,38 @@ def main():
 ╚════════════════════════════════════════════════════════════════╝
     """)
 
+    # Caminhos dos relatórios relativos ao diretório de onde o script foi chamado
+    if '--merge' in sys.argv:
+        report_files = [os.path.abspath(f) for f in sys.argv[sys.argv.index('--merge') + 1:]]
+        if not report_files:
+            print("❌ Indique os relatórios: --merge shard1.ndjson shard2.ndjson ...")
+            return 1
+        return merge_reports(report_files)
+
+    shard = option('--shard', None)
+    if shard is not None:
+        try:
+            shard_index, shard_count = parse_shard(shard)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        report_file = os.path.abspath(option('--report', f"validation_shard_{shard_index}_of_{shard_count}.ndjson"))
+
+    # Mudar para o diretório do script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if shard is not None:
+        return run_shard(shard_index, shard_count, report_file)
+
     # Encontrar todos os arquivos de modelo
-    model_files = []
-    for pattern in ['*.obj', '*.gltf', '*.glb']:
-        model_files.extend(glob.glob(os.path.join('models', pattern)))
+    model_files = find_model_files()
 
     if not model_files:
         print("❌ Nenhum arquivo de modelo encontrado em 'models/'")
         return
 
     print(f"📁 Encontrados {len(model_files)} arquivos de modelo:")
-    for f in sorted(model_files):
+    for f in model_files:
         print(f"  - {f}")
     print()
 
@@ -357,39 +512,14 @@ def main():
     invalid_count = 0
     invalid_files = []
 
-    for filename in sorted(model_files):
+    for filename in model_files:
         if validate_model(filename):
             valid_count += 1
         else:
             invalid_count += 1
             invalid_files.append(filename)
 
-    print(f"""
-╔════════════════════════════════════════════════════════════════╗
-║  RESULTADO DA VALIDAÇÃO                                       ║
-╚════════════════════════════════════════════════════════════════╝
-
-✓ Modelos válidos: {valid_count}
-❌ Modelos inválidos: {invalid_count}
-
-Total: {len(model_files)} modelos analisados
-    """)
-
-    if invalid_files:
-        print("""
-⚠️  ARQUIVOS INVÁLIDOS ENCONTRADOS:""")
-        for f in invalid_files:
-            print(f"  ❌ {f}")
-        print("""
-💡 RECOMENDAÇÕES:
-   - Para GLTF com buffers externos faltantes: converta para GLB ou obtenha os arquivos .bin
-   - Para modelos corrompidos: substitua por versões válidas
-   - Verifique viewers online como https://gltf-viewer.donmccurdy.com/ para testar modelos
-        """)
+    print_summary(valid_count, invalid_count, len(model_files), invalid_files)
 
 if __name__ == '__main__':
-    # Mudar para o diretório do script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    os.chdir(script_dir)
-
-    main()
\ No newline at end of file
+    sys.exit(main())
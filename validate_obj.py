@@ -6,6 +6,10 @@ Utilitário para validar e normalizar modelos OBJ para Cosmic Scales
 import sys
 import math
 import os
+import tempfile
+
+# Bytes lidos de cada vez no modo streaming (aprox., em linhas completas)
+STREAM_CHUNK_BYTES = 2 * 1024 * 1024
 
 def read_obj(filename):
     """Lê um arquivo OBJ e retorna vértices e linhas/faces"""
@@ -199,6 +203,114 @@ def normalize_obj(input_file, output_file=None):
     
     return False
 
+def stream_bounds(filename):
+    """Passo 1 do modo streaming: bounding box e contagens em memória constante"""
+    bmin = [math.inf] * 3
+    bmax = [-math.inf] * 3
+    counts = {'v': 0, 'l': 0, 'f': 0}
+    
+    with open(filename, 'r', newline='') as f:
+        while True:
+            chunk = f.readlines(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            for line in chunk:
+                parts = line.split()
+                if not parts:
+                    continue
+                cmd = parts[0]
+                if cmd == 'v':
+                    for k in range(3):
+                        c = float(parts[k + 1])
+                        if c < bmin[k]:
+                            bmin[k] = c
+                        if c > bmax[k]:
+                            bmax[k] = c
+                    counts['v'] += 1
+                elif cmd in counts:
+                    counts[cmd] += 1
+    
+    if counts['v'] == 0:
+        return None, counts
+    
+    bounds = {
+        'min': tuple(bmin),
+        'max': tuple(bmax),
+        'center': tuple((bmin[k] + bmax[k]) / 2 for k in range(3)),
+        'size': tuple(bmax[k] - bmin[k] for k in range(3))
+    }
+    return bounds, counts
+
+def normalize_obj_streaming(input_file, output_file=None):
+    """Normaliza um OBJ em dois passos, sem carregar o ficheiro em memória
+    
+    Só os registos 'v' são transformados; grupos, vt, vn, usemtl, comentários
+    e restantes linhas são copiados sem alterações.
+    """
+    print(f"\n🔧 Normalizando (streaming): {input_file}")
+    
+    try:
+        bounds, counts = stream_bounds(input_file)
+    except Exception as e:
+        print(f"❌ Erro ao ler {input_file}: {e}")
+        return False
+    
+    if bounds is None:
+        print("  ❌ ERRO: Nenhum vértice encontrado!")
+        return False
+    
+    print(f"✓ Vértices: {counts['v']}")
+    print(f"✓ Linhas: {counts['l']}")
+    print(f"✓ Faces: {counts['f']}")
+    print(f"  Center: ({bounds['center'][0]:.3f}, {bounds['center'][1]:.3f}, {bounds['center'][2]:.3f})")
+    print(f"  Max dimension: {max(bounds['size']):.3f}")
+    
+    if output_file is None:
+        base, ext = os.path.splitext(input_file)
+        output_file = f"{base}_normalized{ext}"
+    
+    center = bounds['center']
+    half = max(bounds['size']) / 2
+    if half == 0:
+        half = 1.0  # Modelo degenerado: apenas centra
+    
+    # Passo 2 escreve num temporário ao lado do destino: --output pode ser o próprio input
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    tmp_name = None
+    try:
+        with open(input_file, 'r', newline='') as src, \
+                tempfile.NamedTemporaryFile('w', dir=output_dir, suffix='.tmp', newline='', delete=False) as dst:
+            tmp_name = dst.name
+            while True:
+                chunk = src.readlines(STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                out = []
+                for line in chunk:
+                    parts = line.split()
+                    if parts and parts[0] == 'v':
+                        ending = line[len(line.rstrip('\r\n')):]
+                        coords = [(float(parts[k + 1]) - center[k]) / half for k in range(3)]
+                        # Componentes extra (w ou cor por vértice) são mantidas
+                        extra = ''.join(' ' + p for p in parts[4:])
+                        out.append(f"v {coords[0]:.6f} {coords[1]:.6f} {coords[2]:.6f}{extra}{ending}")
+                    else:
+                        out.append(line)
+                dst.write(''.join(out))
+        # Permissões de um ficheiro criado normalmente (mkstemp usa 0600)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_name, 0o666 & ~umask)
+        os.replace(tmp_name, output_file)
+    except Exception as e:
+        if tmp_name and os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        print(f"❌ Erro ao escrever {output_file}: {e}")
+        return False
+    
+    print(f"✓ Arquivo normalizado salvo em: {output_file}")
+    return True
+
 def main():
     """Função principal"""
     if len(sys.argv) < 2:
@@ -214,11 +326,15 @@ Opções:
   --validate    Apenas valida o arquivo (padrão)
   --normalize   Normaliza o arquivo (centra e escala para -1 a 1)
   --output <arquivo>  Especifica arquivo de saída para normalização
+  --stream      Com --normalize: normaliza em dois passos sem carregar o
+                ficheiro em memória (mantém grupos, vt, vn, usemtl e
+                restantes registos); não valida o ficheiro
 
 Exemplos:
   python validate_obj.py models/dna.obj
   python validate_obj.py models/earth.obj --normalize
   python validate_obj.py models/city.obj --normalize --output models/city_norm.obj
+  python validate_obj.py scans/huge.obj --normalize --stream
         """)
         return
     
@@ -228,18 +344,27 @@ Exemplos:
         print(f"❌ Arquivo não encontrado: {input_file}")
         return
     
+    output_file = None
+    if '--output' in sys.argv:
+        output_idx = sys.argv.index('--output')
+        if output_idx + 1 < len(sys.argv):
+            output_file = sys.argv[output_idx + 1]
+    
+    # Modo streaming: não carrega o ficheiro inteiro (nem para validar)
+    if '--stream' in sys.argv and '--normalize' not in sys.argv:
+        print("❌ --stream só se aplica a --normalize")
+        return
+    if '--stream' in sys.argv:
+        normalize_obj_streaming(input_file, output_file)
+        print("\n✓ Concluído!")
+        return
+    
     # Validar sempre
     if not validate_obj(input_file):
         return
     
     # Normalizar se solicitado
     if '--normalize' in sys.argv:
-        output_file = None
-        if '--output' in sys.argv:
-            output_idx = sys.argv.index('--output')
-            if output_idx + 1 < len(sys.argv):
-                output_file = sys.argv[output_idx + 1]
-        
         normalize_obj(input_file, output_file)
     
     print("\n✓ Concluído!")